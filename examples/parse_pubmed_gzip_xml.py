@@ -5,7 +5,8 @@ Sample script demonstrating how to use the PubmedParser to process large XML fil
 This script:
 1. Parses a PubMed XML file (gzipped)
 2. Extracts article data
-3. Saves each article as a separate JSON file
+3. Saves each article as a separate JSON file, or all articles as a single
+   JSONL file with a PMID to byte offset index (--jsonl)
 4. Provides progress tracking and error handling
 
 Usage:
@@ -16,9 +17,9 @@ Example:
 """
 import os
 import sys
-import json
 import time
 import argparse
+import orjson
 from tqdm import tqdm
 from loguru import logger
 
@@ -27,6 +28,13 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.parsers.pubmed_parser import PubmedParser
 
+# Redraw the progress bar at most twice a second instead of per article
+PROGRESS_BAR_OPTIONS = {
+    "desc": "Processing articles",
+    "mininterval": 0.5,
+    "smoothing": 0.05,
+}
+
 
 def parse_arguments():
     """Parse command line arguments."""
@@ -65,6 +73,34 @@ def parse_arguments():
         action="store_true",
         help="Retrieve journal ranking information (slower)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to build the articles (default: 1)",
+    )
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help=(
+            "Write all articles to a single articles.jsonl file with a "
+            "PMID to byte offset index instead of one JSON file per article"
+        ),
+    )
+    parser.add_argument(
+        "--languages",
+        nargs="+",
+        help="Only keep articles in these languages, e.g. --languages eng",
+    )
+    parser.add_argument(
+        "--publication-types",
+        nargs="+",
+        help='Only keep articles of these publication types, e.g. "Journal Article"',
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory for caching citation counts and journal rankings between runs",
+    )
     parser.add_argument(
         "--log-level",
         choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
@@ -75,6 +111,75 @@ def parse_arguments():
     return parser.parse_args()
 
 
+def save_articles_json(articles_iter, output_dir):
+    """Save each article as a separate JSON file.
+
+    Args:
+        articles_iter: Iterator of article dictionaries (None for failed articles)
+        output_dir: Directory to save the JSON files in
+
+    Returns:
+        Tuple of (number of saved articles, number of errors)
+    """
+    article_count = 0
+    error_count = 0
+
+    for article in tqdm(articles_iter, **PROGRESS_BAR_OPTIONS):
+        if article is None:
+            error_count += 1
+            continue
+
+        # Get PMID and save as JSON
+        pmid = article.get("pmid", f"unknown_{article_count}")
+        output_file = os.path.join(output_dir, f"pubmed_{pmid}.json")
+
+        try:
+            with open(output_file, "wb") as f:
+                f.write(orjson.dumps(article, option=orjson.OPT_INDENT_2))
+            article_count += 1
+        except Exception as e:
+            logger.error(f"Error saving article {pmid}: {e}")
+            error_count += 1
+
+    return article_count, error_count
+
+
+def save_articles_jsonl(pubmed, input_file, output_dir, workers=1):
+    """Save all articles to a single JSONL file, one article per line.
+
+    A tab separated index of PMID to byte offset is written next to it
+    (articles.index.tsv) so single articles can be read back with a seek.
+
+    Args:
+        pubmed: The PubmedParser used to parse the input file
+        input_file: Path to the input PubMed XML file (gzipped)
+        output_dir: Directory to save the JSONL and index files in
+        workers: Number of worker processes used to build the articles
+
+    Returns:
+        Tuple of (number of saved articles, number of errors)
+    """
+    output_file = os.path.join(output_dir, "articles.jsonl")
+    index_file = os.path.join(output_dir, "articles.index.tsv")
+
+    with open(index_file, "w", encoding="utf-8") as index, tqdm(
+        **PROGRESS_BAR_OPTIONS
+    ) as progress:
+
+        def on_article(entry):
+            """Index a written article and advance the progress bar."""
+            if entry is not None:
+                index.write(f"{entry[0]}\t{entry[1]}\n")
+            progress.update()
+
+        article_count, error_count = pubmed.parse_pubmed_xml_to_jsonl(
+            input_file, output_file, workers, on_article=on_article
+        )
+
+    logger.info(f"Saved articles to {output_file} (index: {index_file})")
+    return article_count, error_count
+
+
 def main():
     """Main function to parse PubMed XML and save as JSON."""
     args = parse_arguments()
@@ -92,13 +197,17 @@ def main():
         ),
     )
 
-    # Add file handler if log_file is provided
+    # Add file handler if log_file is provided. loguru opens log files line
+    # buffered, which flushes every record to disk; a 64 KiB buffer turns them
+    # into few large writes. loguru flushes the buffer when the sink is removed
+    # at exit.
     if args.log_file:
         logger.add(
             args.log_file,
             level=args.log_level,
             rotation="10 MB",
             compression="zip",
+            buffering=64 * 1024,
         )
 
     # Check if input file exists
@@ -119,42 +228,39 @@ def main():
         sentence_overlap=args.sentence_overlap,
         get_citation_count_bool=args.get_citations,
         get_journal_ranking_bool=args.get_journal_ranking,
+        cache_dir=args.cache_dir,
+        allowed_languages=args.languages,
+        allowed_publication_types=args.publication_types,
     )
 
     # Start parsing
     logger.info(f"Parsing {args.input_file}...")
     start_time = time.time()
 
-    # Get an iterator for the articles
-    articles_iter = pubmed.parse_pubmed_xml_iter(args.input_file)
-
     # Process articles with progress tracking
-    article_count = 0
-    error_count = 0
-
-    for article in tqdm(articles_iter, desc="Processing articles"):
-        if article is None:
-            error_count += 1
-            continue
-
-        # Get PMID and save as JSON
-        pmid = article.get("pmid", f"unknown_{article_count}")
-        output_file = os.path.join(args.output_dir, f"pubmed_{pmid}.json")
+    if args.jsonl:
+        article_count, error_count = save_articles_jsonl(
+            pubmed, args.input_file, args.output_dir, args.workers
+        )
+    else:
+        # Get an iterator for the articles
+        if args.workers > 1:
+            articles_iter = pubmed.parse_pubmed_xml_iter_parallel(
+                args.input_file, max_workers=args.workers
+            )
+        else:
+            articles_iter = pubmed.parse_pubmed_xml_iter(args.input_file)
 
-        try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(article, f, ensure_ascii=False, indent=2)
-            article_count += 1
-        except Exception as e:
-            logger.error(f"Error saving article {pmid}: {e}")
-            error_count += 1
+        article_count, error_count = save_articles_json(articles_iter, args.output_dir)
 
     # Print summary
     elapsed_time = time.time() - start_time
     logger.info(f"Processing complete in {elapsed_time:.2f} seconds")
     logger.info(f"Successfully processed {article_count} articles")
     if error_count > 0:
-        logger.warning(f"Encountered errors with {error_count} articles")
+        logger.warning(
+            f"Skipped {error_count} articles (errors or excluded by the filters)"
+        )
 
     return 0
 
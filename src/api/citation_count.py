@@ -2,25 +2,147 @@
 of an article based on the DOI using the Crossref API (https://api.crossref.org/works/{doi}).
 """
 
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Optional, Tuple
 from loguru import logger
+import orjson
 import requests
 
+from src.api.http_session import RETRY_STATUS_CODES, create_session
+from src.utils.disk_cache import DiskCache
+
 
 # Constants
 CROSSREF_API_URL = "https://api.crossref.org/works/"
 DEFAULT_TIMEOUT = 15
 DEFAULT_EMAIL = "mailto@mailto"  # Contact email for API requests
+DEFAULT_MAX_WORKERS = 16
+CACHE_TTL = 7 * 24 * 3600  # Citation counts change slowly, refresh weekly
+NEGATIVE_CACHE_TTL = 24 * 3600  # Retry failed lookups after a day
+MAX_RETRY_AFTER = 60  # Upper bound in seconds on a Retry-After pause
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failed requests that open the circuit
+CIRCUIT_RESET_TIMEOUT = 60  # Seconds before requests are tried again
+
+# Shared session so repeated lookups reuse pooled keep-alive connections. A 429
+# is not retried inside it, which would sleep for Retry-After in this thread, but
+# reaches _RATE_LIMITER, which pauses all threads for at most MAX_RETRY_AFTER
+_SESSION = create_session(
+    pool_maxsize=64,
+    max_retry_after=0,
+    retry_status_codes=[status for status in RETRY_STATUS_CODES if status != 429],
+)
+
+
+class _RateLimiter:
+    """Thread-safe limiter spacing out requests across all worker threads.
+
+    The request interval follows the X-Rate-Limit-Limit / X-Rate-Limit-Interval
+    headers Crossref sends with every response, and a throttled (429) response
+    pauses all threads for the Retry-After period.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._interval = 0.0
+        self._next_request = 0.0
+
+    def wait(self) -> None:
+        """Block until the next request slot is available."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_request)
+            self._next_request = start + self._interval
+
+        if start > now:
+            time.sleep(start - now)
+
+    def update(self, headers) -> None:
+        """Adjust the request interval to the rate limit headers of a response."""
+        limit = headers.get("X-Rate-Limit-Limit")
+        interval = headers.get("X-Rate-Limit-Interval")
+        if not limit or not interval:
+            return
+
+        try:
+            seconds = float(interval.rstrip("s"))
+            self._interval = seconds / int(limit)
+        except (TypeError, ValueError, ZeroDivisionError):
+            pass
+
+    def pause(self, seconds: float) -> None:
+        """Delay all further requests by the given number of seconds."""
+        with self._lock:
+            self._next_request = max(self._next_request, time.monotonic() + seconds)
+
+
+class _CircuitBreaker:
+    """Thread-safe circuit breaker that stops requests while Crossref is down.
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive timeouts, connection errors or
+    server errors, requests are skipped for CIRCUIT_RESET_TIMEOUT seconds
+    instead of each one stalling for the full timeout. After that the circuit
+    is half-open: a single probe request is let through while the others are
+    still skipped. Its success closes the circuit and a failure reopens it; a
+    probe that reports neither is replaced after another CIRCUIT_RESET_TIMEOUT.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ):
+        self._lock = threading.Lock()
+        self._failure_threshold = failure_threshold
+        self._reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until = 0.0
+
+    def allow(self) -> bool:
+        """Check whether a request may be sent."""
+        with self._lock:
+            if self._failures < self._failure_threshold:
+                return True
+            now = time.monotonic()
+            if now < self._open_until:
+                return False
+            # Half-open, this request is the probe and the rest wait for it
+            self._open_until = now + self._reset_timeout
+            return True
+
+    def record_success(self) -> None:
+        """Close the circuit after a request that reached Crossref."""
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self._failure_threshold:
+                self._open_until = time.monotonic() + self._reset_timeout
+
+
+_RATE_LIMITER = _RateLimiter()
+_CIRCUIT_BREAKER = _CircuitBreaker()
+# Returned by _request_citation_count for throttled lookups, timeouts, server
+# errors and skipped requests; unlike definitive misses these are not cached
+_TRANSIENT_FAILURE = object()
 
 
 def get_article_citation_count(
-    doi: str = None, pmid: Optional[str] = None
+    doi: str = None,
+    pmid: Optional[str] = None,
+    cache: Optional[DiskCache] = None,
 ) -> Optional[int]:
     """Get the citation count of an article based on the DOI using the Crossref API.
 
     Args:
         doi: The DOI (Digital Object Identifier) of the article
         pmid: The PubMed ID of the article (used for logging if DOI is missing)
+        cache: Optional persistent cache of DOI to citation count. On a hit the
+            Crossref API is not queried.
 
     Returns:
         The citation count of the article as an integer, or None if the count couldn't be retrieved
@@ -36,25 +158,80 @@ def get_article_citation_count(
         logger.warning(f"DOI is empty, cannot get citation count for PMID {pmid}")
         return None
 
+    if cache is not None:
+        found, citation_count = cache.get(doi)
+        if found:
+            logger.debug(f"Citation count for DOI {doi} found in cache")
+            return citation_count
+
+    citation_count = _request_citation_count(doi, pmid)
+    if citation_count is _TRANSIENT_FAILURE:
+        return None
+
+    if cache is not None:
+        cache.set(doi, citation_count)
+
+    return citation_count
+
+
+def _request_citation_count(doi: str, pmid: Optional[str]) -> Optional[int]:
+    """Request the citation count of an article from the Crossref API.
+
+    Args:
+        doi: The DOI of the article
+        pmid: The PubMed ID of the article (used for logging)
+
+    Returns:
+        The citation count of the article, None if Crossref has no count for
+        the DOI, or _TRANSIENT_FAILURE if the request was throttled, failed
+        without a definitive answer or was skipped by the circuit breaker
+    """
     # Prepare request parameters
     params = {"mailto": DEFAULT_EMAIL}
     url = f"{CROSSREF_API_URL}{doi}"
     
+    if not _CIRCUIT_BREAKER.allow():
+        logger.debug(f"Crossref circuit open, skipping DOI {doi} (PMID {pmid})")
+        return _TRANSIENT_FAILURE
+
     logger.debug(f"Requesting citation count for DOI {doi} (PMID {pmid})")
 
     try:
         # Make API request with timeout
-        response = requests.get(url, params=params, timeout=DEFAULT_TIMEOUT)
+        _RATE_LIMITER.wait()
+        response = _SESSION.get(url, params=params, timeout=DEFAULT_TIMEOUT)
+        _RATE_LIMITER.update(response.headers)
+
+        # Still throttled after the retries, back off all threads
+        if response.status_code == 429:
+            retry_after = _retry_after_seconds(response.headers)
+            logger.warning(
+                f"Crossref rate limit hit for DOI {doi} (PMID {pmid}), "
+                f"pausing requests for {retry_after} seconds"
+            )
+            _RATE_LIMITER.pause(retry_after)
+            return _TRANSIENT_FAILURE
+
+        # Server errors left after the retries mean Crossref is unavailable
+        if response.status_code >= 500:
+            logger.warning(
+                f"Crossref server error for DOI {doi} (PMID {pmid}). "
+                f"Status code: {response.status_code}"
+            )
+            _CIRCUIT_BREAKER.record_failure()
+            return _TRANSIENT_FAILURE
+
+        _CIRCUIT_BREAKER.record_success()
 
-        # Check if request was successful
+        # Check if request was successful, a 404 means the DOI is unknown
         if response.status_code != 200:
             logger.warning(
                 f"Failed to get citation count for DOI {doi} (PMID {pmid}). Status code: {response.status_code}"
             )
             return None
 
-        # Parse response data
-        data = response.json()
+        # Parse response data, orjson decodes the raw bytes much faster than json
+        data = orjson.loads(response.content)
 
         # Extract citation count from response
         if "message" in data and "is-referenced-by-count" in data["message"]:
@@ -67,13 +244,64 @@ def get_article_citation_count(
 
     except requests.exceptions.Timeout:
         logger.warning(f"Request timed out for DOI {doi} (PMID {pmid})")
-        return None
+        _CIRCUIT_BREAKER.record_failure()
+        return _TRANSIENT_FAILURE
     except requests.exceptions.RequestException as e:
         logger.warning(f"Request failed for DOI {doi} (PMID {pmid}): {str(e)}")
-        return None
+        _CIRCUIT_BREAKER.record_failure()
+        return _TRANSIENT_FAILURE
     except ValueError as e:
         logger.warning(f"Failed to parse JSON response for DOI {doi} (PMID {pmid}): {str(e)}")
         return None
     except Exception as e:
         logger.warning(f"Unexpected error for DOI {doi} (PMID {pmid}): {str(e)}")
         return None
+
+
+def _retry_after_seconds(headers) -> float:
+    """Get the Retry-After delay of a response, bounded by MAX_RETRY_AFTER.
+
+    Args:
+        headers: Response headers
+
+    Returns:
+        The delay in seconds, or 1 if the header is missing or not a number
+    """
+    try:
+        retry_after = float(headers.get("Retry-After", 1))
+    except (TypeError, ValueError):
+        retry_after = 1.0
+    return min(max(retry_after, 0.0), MAX_RETRY_AFTER)
+
+
+def get_article_citation_counts(
+    pairs: Iterable[Tuple[Optional[str], Optional[str]]],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache: Optional[DiskCache] = None,
+) -> List[Optional[int]]:
+    """Get the citation counts of several articles concurrently.
+
+    Args:
+        pairs: Iterable of (doi, pmid) tuples
+        max_workers: Maximum number of concurrent requests
+        cache: Optional persistent cache of DOI to citation count
+
+    Returns:
+        List of citation counts in the same order as the input pairs
+
+    Examples:
+        >>> get_article_citation_counts([("10.1038/s41586-020-2649-2", "32939066")])
+        [42]
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+
+    logger.debug(f"Requesting citation counts for {len(pairs)} articles")
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as executor:
+        return list(
+            executor.map(
+                lambda pair: get_article_citation_count(*pair, cache=cache), pairs
+            )
+        )
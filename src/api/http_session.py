@@ -0,0 +1,73 @@
+"""This module contains the create_session function for building the pooled HTTP
+sessions shared by the API modules.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+DEFAULT_MAX_RETRY_AFTER = 60  # Upper bound in seconds on a Retry-After sleep
+
+
+class _BoundedRetry(Retry):
+    """Retry that sleeps at most max_retry_after seconds for a Retry-After."""
+
+    def __init__(self, *args, max_retry_after=DEFAULT_MAX_RETRY_AFTER, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kw):
+        # urllib3 builds a new Retry per attempt, keep the bound on it
+        kw.setdefault("max_retry_after", self.max_retry_after)
+        return super().new(**kw)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None:
+            return None
+        return min(retry_after, self.max_retry_after)
+
+
+def create_session(
+    pool_maxsize: int = 32,
+    retries: int = 3,
+    max_retry_after: float = DEFAULT_MAX_RETRY_AFTER,
+    retry_status_codes=RETRY_STATUS_CODES,
+) -> requests.Session:
+    """Create a requests session with keep-alive connection pooling and retries.
+
+    Reusing one session per API avoids a new TCP and TLS handshake per request.
+    Failed requests with a retryable status are retried with exponential
+    backoff, honouring Retry-After up to max_retry_after seconds. Once the
+    retries are exhausted the last response is returned instead of raising, so
+    callers can inspect its status.
+
+    Args:
+        pool_maxsize: Maximum number of pooled connections per host
+        retries: Number of retries for failed or throttled requests
+        max_retry_after: Upper bound in seconds on the sleep for a Retry-After
+            header, so a server cannot block a request for hours. 0 ignores
+            Retry-After, so retries only use the exponential backoff.
+        retry_status_codes: Response status codes that are retried
+
+    Returns:
+        The configured session
+    """
+    adapter = HTTPAdapter(
+        pool_connections=pool_maxsize,
+        pool_maxsize=pool_maxsize,
+        max_retries=_BoundedRetry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=retry_status_codes,
+            allowed_methods=["GET", "POST"],
+            raise_on_status=False,
+            respect_retry_after_header=max_retry_after > 0,
+            max_retry_after=max_retry_after,
+        ),
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -2,30 +2,56 @@
 of a journal based on the journal name using the exaly website https://exaly.com/journals/
 """
 
+import re
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 from functools import lru_cache
-from typing import Dict, Optional, Any, List
+from typing import Dict, Iterable, Optional, Any, Iterator, List
 from loguru import logger
 
 import requests
-from bs4 import BeautifulSoup
+from lxml import etree  # pylint: disable=import-error
+
+from src.api.http_session import create_session
+from src.utils.disk_cache import DiskCache
 
 # Constants
 EXALY_URL = "https://exaly.com/journals/"
 SEARCH_URL = f"{EXALY_URL}?q="
 DEFAULT_TIMEOUT = 15
-DEFAULT_PARSER = "html.parser"  # Alternative: "lxml" if installed
+STREAM_CHUNK_SIZE = 16 * 1024
+MAX_CONTENT_LENGTH = 5 * 1024 * 1024  # A search results page is far smaller
+CACHE_TTL = 30 * 24 * 3600  # Journal rankings change slowly, refresh monthly
+NEGATIVE_CACHE_TTL = 24 * 3600  # Retry failed lookups after a day
+UNUSED_COLUMNS = frozenset(["star", "#"])  # Table columns left out of the ranking
+DEFAULT_MAX_WORKERS = 4  # Keep concurrent scraping of exaly polite
+
+# An ampersand with any surrounding whitespace, normalized to " and "
+_AMPERSAND_RE = re.compile(r"\s*&\s*")
+
+# Counts, optionally abbreviated with a thousands or millions suffix, e.g. "8.9K"
+_COUNT_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([KM]?)$")
+_COUNT_MULTIPLIERS = {"": 1, "K": 1000, "M": 1000000}
+
+# Shared session so repeated lookups reuse pooled keep-alive connections
+_SESSION = create_session(pool_maxsize=16)
 
 
-@lru_cache(maxsize=128)
 def get_journal_ranking(
-    journal_name: Optional[str] = None, pmid: Optional[str] = None
+    journal_name: Optional[str] = None,
+    pmid: Optional[str] = None,
+    cache: Optional[DiskCache] = None,
 ) -> Dict[str, Any]:
     """Get the ranking of a journal based on the journal name using the exaly website.
 
+    Lookups are memoized in memory on the normalized journal name, so articles of
+    the same journal only query the disk cache or the exaly website once per run.
+
     Args:
         journal_name: The full name of the journal
         pmid: PubMed ID (used for logging purposes)
+        cache: Optional persistent cache of journal name to ranking info. On a
+            hit the exaly website is not queried.
 
     Returns:
         Dictionary containing the journal ranking info
@@ -44,129 +70,323 @@ def get_journal_ranking(
         )
         return {}
 
-    logger.debug(f"Getting journal ranking for {journal_name}")
+    ranking = _get_cached_journal_ranking(_normalize_journal_name(journal_name), cache)
 
-    try:
-        # Normalize journal name and prepare query
-        normalized_name = journal_name.replace("&", "and")
-        query = quote(normalized_name)
-        url = f"{SEARCH_URL}{query}"
-
-        # Send request
-        response = requests.get(url, timeout=DEFAULT_TIMEOUT)
-
-        if response.status_code != 200:
-            logger.warning(
-                (
-                    f"Failed to get journal ranking for {journal_name}."
-                    "Status code: {response.status_code}"
-                )
+    # Copy so callers cannot modify the memoized result
+    return dict(ranking)
+
+
+def get_journal_rankings(
+    journal_names: Iterable[Optional[str]],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache: Optional[DiskCache] = None,
+) -> List[Dict[str, Any]]:
+    """Get the rankings of several journals concurrently.
+
+    Each distinct journal is looked up once, however many times it occurs.
+
+    Args:
+        journal_names: Iterable of full journal names
+        max_workers: Maximum number of concurrent requests
+        cache: Optional persistent cache of journal name to ranking info
+
+    Returns:
+        List of journal ranking dictionaries in the same order as the input
+        names, with an empty dictionary for empty names
+
+    Examples:
+        >>> get_journal_rankings(["Nature", "nature", ""])
+        [{'Journal': 'Nature', ...}, {'Journal': 'Nature', ...}, {}]
+    """
+    normalized_names = [
+        _normalize_journal_name(name) if name else None for name in journal_names
+    ]
+    unique_names = list(dict.fromkeys(name for name in normalized_names if name))
+    if not unique_names:
+        return [{} for _ in normalized_names]
+
+    logger.debug(f"Requesting journal rankings for {len(unique_names)} journals")
+
+    workers = min(max_workers, len(unique_names))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        rankings = dict(
+            zip(
+                unique_names,
+                executor.map(
+                    lambda name: _get_cached_journal_ranking(name, cache),
+                    unique_names,
+                ),
             )
-            return {}
+        )
 
-        # Parse response
-        soup = BeautifulSoup(response.content, DEFAULT_PARSER)
-        table = soup.find("table")
+    # Copy so callers cannot modify the memoized results
+    return [dict(rankings[name]) if name else {} for name in normalized_names]
 
-        if not table:
-            logger.warning(f"No ranking table found for journal {journal_name}")
-            return {}
 
-        # Extract table data
-        table_data = _extract_table_data(table)
+def _normalize_journal_name(journal_name: str) -> str:
+    """Normalize a journal name for use as a cache key and search query.
 
-        if not table_data or len(table_data) < 2:
-            logger.warning("Empty or invalid table data for journal %s", journal_name)
-            return {}
+    Args:
+        journal_name: The full name of the journal
+
+    Returns:
+        The case-folded journal name with "&" replaced by "and" and
+        whitespace collapsed
+    """
+    return " ".join(_AMPERSAND_RE.sub(" and ", journal_name).split()).casefold()
+
+
+@lru_cache(maxsize=8192)
+def _get_cached_journal_ranking(
+    journal_name: str, cache: Optional[DiskCache]
+) -> Dict[str, Any]:
+    """Get the ranking of a journal from the disk cache or the exaly website.
+
+    Args:
+        journal_name: The normalized journal name
+        cache: Optional persistent cache of journal name to ranking info
+
+    Returns:
+        Dictionary containing the journal ranking info
+    """
+    if cache is not None:
+        found, ranking = cache.get(journal_name)
+        if found:
+            logger.debug(f"Journal ranking for {journal_name} found in cache")
+            return ranking
+
+    ranking = _request_journal_ranking(journal_name)
+
+    if cache is not None:
+        cache.set(journal_name, ranking)
+
+    return ranking
+
+
+def _request_journal_ranking(journal_name: str) -> Dict[str, Any]:
+    """Request and parse the ranking of a journal from the exaly website.
+
+    Args:
+        journal_name: The normalized journal name
+
+    Returns:
+        Dictionary containing the journal ranking info, or an empty dictionary
+        if the request failed
+    """
+    logger.debug(f"Getting journal ranking for {journal_name}")
 
-        # Find exact match or use first result
-        ranking = _find_journal_match(table_data, normalized_name, pmid)
+    try:
+        # The name is already normalized by the caller, only quote it
+        url = f"{SEARCH_URL}{quote(journal_name)}"
+
+        # Send request, streaming the body so parsing can stop at the match
+        response = _SESSION.get(url, timeout=DEFAULT_TIMEOUT, stream=True)
+
+        drain = True
+        try:
+            if response.status_code != 200:
+                logger.warning(
+                    (
+                        f"Failed to get journal ranking for {journal_name}. "
+                        f"Status code: {response.status_code}"
+                    )
+                )
+                return {}
+
+            content_length = response.headers.get("Content-Length")
+            if content_length and int(content_length) > MAX_CONTENT_LENGTH:
+                logger.warning(
+                    (
+                        f"Response for journal {journal_name} is too large "
+                        f"({content_length} bytes), skipping"
+                    )
+                )
+                drain = False
+                return {}
 
-        # Clean up ranking data
-        if ranking:
-            _clean_ranking_data(ranking)
+            # Find exact match or use first result
+            ranking = _find_journal_match(_iter_table_rows(response), journal_name)
+        finally:
+            _release_response(response, drain)
 
-        # convert K and M to numbers
-        for key, value in ranking.items():
-            if "K" in value:
-                ranking[key] = int(float(value.replace("K", "")) * 1000)
-            elif "M" in value:
-                ranking[key] = int(float(value.replace("M", "")) * 1000000)
+        if not ranking:
+            logger.warning(f"No ranking table data found for journal {journal_name}")
+            return {}
 
-            if key == "Impact Factor":
-                ranking[key] = float(value)
+        # Convert abbreviated counts and the impact factor to numbers
+        _convert_ranking_values(ranking)
 
         return ranking
 
     except requests.exceptions.Timeout:
-        logger.warning("Request timed out for journal %s", journal_name)
+        logger.warning("Request timed out for journal {}", journal_name)
         return {}
     except requests.exceptions.RequestException as e:
-        logger.warning("Request failed for journal %s: %s", journal_name, str(e))
+        logger.warning("Request failed for journal {}: {}", journal_name, e)
         return {}
     except Exception as e:
-        logger.warning("Unexpected error for journal %s: %s", journal_name, str(e))
+        logger.warning("Unexpected error for journal {}: {}", journal_name, e)
         return {}
 
 
-def _extract_table_data(table) -> List[List[str]]:
-    """Extract data from HTML table.
+def _release_response(response, drain: bool = True) -> None:
+    """Close a streamed response, returning its connection to the pool.
 
-    Args:
-        table: BeautifulSoup table element
+    Closing a partly read response closes its connection, so the rest of the
+    body is read first. A search page is small; bodies beyond
+    MAX_CONTENT_LENGTH, or with drain False, are not read and their
+    connection is dropped instead.
 
-    Returns:
-        List of rows, where each row is a list of cell values
+    Args:
+        response: Streamed requests response
+        drain: Whether to read the rest of the body before closing
     """
-    table_data = []
-
     try:
-        for row in table.find_all("tr"):
-            row_data = []
-            for cell in row.find_all(["th", "td"]):
-                row_data.append(cell.get_text(strip=True))
+        if drain:
+            drained = 0
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                drained += len(chunk)
+                if drained > MAX_CONTENT_LENGTH:
+                    break
+    except requests.exceptions.RequestException:
+        # Already fully read (StreamConsumedError) or the connection failed
+        pass
+    finally:
+        response.close()
+
+
+def _iter_table_rows(response) -> Iterator[List[str]]:
+    """Stream the rows of the first HTML table in a response.
+
+    The body is fed to an incremental HTML parser chunk by chunk, so only as
+    much of the page is downloaded and parsed as the caller consumes.
+
+    Args:
+        response: Streamed requests response containing an HTML page
+
+    Yields:
+        Each non-empty row of the first table as a list of cell values
+    """
+    parser = etree.HTMLPullParser(events=("end",), tag=("tr", "table"))
+    first_table = None
+
+    for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            if element.tag == "table":
+                if element is first_table:
+                    return
+                continue
+
+            table = next(element.iterancestors("table"), None)
+            if first_table is None:
+                first_table = table
+            elif table is not first_table:
+                continue
+
+            row_data = [_cell_text(cell) for cell in element.iter("th", "td")]
+            element.clear()
             if row_data:
-                table_data.append(row_data)
-    except Exception as e:
-        logger.error("Error extracting table data: %s", str(e))
+                yield row_data
+
+
+def _cell_text(cell) -> str:
+    """Get the text of a table cell, with each text fragment stripped.
+
+    Args:
+        cell: lxml th or td element
 
-    return table_data
+    Returns:
+        The concatenated, stripped text of the cell
+    """
+    return "".join(text.strip() for text in cell.itertext())
 
 
-def _find_journal_match(table_data, journal_name, pmid):
+def _find_journal_match(table_data, journal_name):
     """Find the best matching journal in the table data.
 
+    The rows are consumed lazily and the search stops at the first exact match.
+
     Args:
-        table_data: List of rows from the table
+        table_data: Iterable of rows from the table, starting with the header row
         journal_name: Journal name to match
 
     Returns:
-        Dictionary with journal ranking data
+        Dictionary with journal ranking data, without the UNUSED_COLUMNS
     """
-    if not table_data or len(table_data) < 2:
+    rows = iter(table_data)
+    header_row = next(rows, None)
+    if not header_row:
         return {}
 
-    headers = table_data[0]
+    # Leave out unused columns while building the row dictionaries
+    keep = [i for i, header in enumerate(header_row) if header not in UNUSED_COLUMNS]
+    headers = [header_row[i] for i in keep]
+
+    def to_ranking(row):
+        return dict(zip(headers, (row[i] for i in keep if i < len(row))))
 
-    # Try to find exact match
-    for row in table_data[1:]:
-        if row and len(row) >= len(headers):
-            row_journal_name = row[0].replace("&", "and").lower()
-            if row_journal_name == journal_name.lower():
-                return dict(zip(headers, row))
+    # Try to find exact match, normalizing the searched name only once
+    target = _normalize_journal_name(journal_name)
+    first_row = None
+    for row in rows:
+        if first_row is None:
+            first_row = row
+        if row and len(row) >= len(header_row):
+            if _normalize_journal_name(row[0]) == target:
+                return to_ranking(row)
 
     # If no exact match, use first result
-    if len(table_data) > 1:
+    if first_row is not None:
         logger.warning(
-            f"No exact match found for journal {journal_name}. Using first result for PMID {pmid}"
+            f"No exact match found for journal {journal_name}. Using first result"
         )
-        return dict(zip(headers, table_data[1]))
+        return to_ranking(first_row)
 
     return {}
 
 
-def _clean_ranking_data(ranking):
-    """Clean up ranking data by removing unwanted characters.
+def _parse_count(value: str):
+    """Parse a count such as "950", "8.9K" or "4.2M" into an integer.
+
+    Args:
+        value: The cell text
+
+    Returns:
+        The count as an integer, or the text unchanged if it is not a count
+    """
+    match = _COUNT_RE.match(value)
+    if not match:
+        return value
+    number, suffix = match.groups()
+    return int(float(number) * _COUNT_MULTIPLIERS[suffix])
+
+
+def _parse_float(value: str):
+    """Parse a number such as an impact factor into a float.
+
+    Args:
+        value: The cell text
+
+    Returns:
+        The number as a float, or the text unchanged if it is not a number
+    """
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+# Converter of each numeric ranking column, other columns are kept as strings
+_COLUMN_CONVERTERS = {
+    "Impact Factor": _parse_float,
+    "Citations": _parse_count,
+    "Articles": _parse_count,
+}
+
+
+def _convert_ranking_values(ranking):
+    """Convert the numeric columns of the ranking data.
 
     Args:
         ranking: Dictionary with journal ranking data
@@ -174,7 +394,6 @@ def _clean_ranking_data(ranking):
     Note:
         Modifies the dictionary in place
     """
-    # Remove unnecessary columns
-    for key in ["star", "#"]:
+    for key, converter in _COLUMN_CONVERTERS.items():
         if key in ranking:
-            ranking.pop(key)
+            ranking[key] = converter(ranking[key])
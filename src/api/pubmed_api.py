@@ -1,13 +1,19 @@
 """Module for interacting with the PubMed API."""
 
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 from loguru import logger
 import requests
 
+from src.api.http_session import create_session
+
 PUBMED_API_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+EFETCH_BATCH_SIZE = 200  # PMIDs per EFetch request, as recommended by NCBI
+
+# Shared session so repeated fetches reuse pooled keep-alive connections
+_SESSION = create_session(pool_maxsize=16)
 
 
-def get_pubmed_article_xml(pmid: str, timeout: int = 15) -> Optional[str]:
+def get_pubmed_article_xml(pmid: str, timeout: int = 15) -> Optional[bytes]:
     """Get the PubMed article XML from the PMID.
 
     Args:
@@ -15,7 +21,7 @@ def get_pubmed_article_xml(pmid: str, timeout: int = 15) -> Optional[str]:
         timeout: Timeout for HTTP requests in seconds
 
     Returns:
-        The XML of the article as a string, or None if retrieval failed
+        The raw XML bytes of the article, or None if retrieval failed
 
     Raises:
         ValueError: If PMID is empty
@@ -25,21 +31,22 @@ def get_pubmed_article_xml(pmid: str, timeout: int = 15) -> Optional[str]:
 
     params = {
         "db": "pubmed",
-        "id": f"[{pmid}]",
+        "id": pmid,
         "rettype": "xml",
     }
 
     logger.debug(f"Requesting PubMed article XML for PMID {pmid}")
 
     try:
-        response = requests.get(
+        response = _SESSION.get(
             PUBMED_API_URL,
             params=params,
             timeout=timeout,
         )
         response.raise_for_status()
         logger.debug(f"Successfully retrieved XML for PMID {pmid}")
-        return response.text
+        # Undecoded body, lxml parses the bytes using the declared XML encoding
+        return response.content
 
     except requests.exceptions.HTTPError as e:
         logger.error(f"HTTP error retrieving PubMed article {pmid}: {e}")
@@ -55,4 +62,42 @@ def get_pubmed_article_xml(pmid: str, timeout: int = 15) -> Optional[str]:
         return None
 
 
+def get_pubmed_articles_xml(
+    pmids: Iterable[str], timeout: int = 15, chunk_size: int = EFETCH_BATCH_SIZE
+) -> Iterator[Optional[bytes]]:
+    """Get the PubMed XML of several articles with batched EFetch requests.
+
+    The PMIDs are sent chunk_size at a time in the body of a POST request,
+    which avoids the URL length limit of a GET with many IDs. Each response
+    is a PubmedArticleSet holding the articles of one chunk.
+
+    Args:
+        pmids: The PubMed IDs of the articles
+        timeout: Timeout for HTTP requests in seconds
+        chunk_size: Maximum number of PMIDs per request
+
+    Yields:
+        The raw XML bytes of each chunk, or None if retrieval of the chunk failed
+    """
+    pmids = [str(pmid) for pmid in pmids if pmid]
+    params = {"db": "pubmed", "rettype": "xml"}
+
+    for start in range(0, len(pmids), chunk_size):
+        chunk = pmids[start : start + chunk_size]
+        logger.debug(f"Requesting PubMed article XML for {len(chunk)} PMIDs")
+
+        try:
+            response = _SESSION.post(
+                PUBMED_API_URL,
+                params=params,
+                data={"id": ",".join(chunk)},
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            yield response.content
 
+        except requests.exceptions.RequestException as e:
+            logger.error(
+                f"Error retrieving PubMed articles {chunk[0]}..{chunk[-1]}: {e}"
+            )
+            yield None
@@ -1,16 +1,83 @@
 """Module containing classes for extracting information from PubMed XML."""
 
-from itertools import chain
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+
+from lxml import etree
 
 LIST_SEPERATOR = ";"
 
+# Field queries relative to the PubmedArticle element, compiled once instead of
+# being re-parsed by every find()/findall() call. Absolute child paths avoid a
+# descendant walk of the whole article for each field.
+_XP_ARTICLE = etree.XPath("MedlineCitation/Article")
+_XP_ARTICLE_IDS = etree.XPath("PubmedData/ArticleIdList/ArticleId")
+_XP_KEYWORDS = etree.XPath("MedlineCitation/KeywordList/Keyword")
+_XP_HISTORY_DATES = etree.XPath("PubmedData/History/PubMedPubDate")
+_XP_JOURNAL = etree.XPath("MedlineCitation/Article/Journal")
+_XP_AUTHORS = etree.XPath("MedlineCitation/Article/AuthorList/Author")
+_XP_MESH_HEADING_LIST = etree.XPath("MedlineCitation/MeshHeadingList")
+
+
+def resolve_pubmed_article(xml_tree):
+    """Resolve the PubmedArticle element the field queries are relative to.
+
+    Accepts the PubmedArticle element itself, a parsed document or any other
+    ancestor of it such as a PubmedArticleSet root, in which case the first
+    PubmedArticle is used. Other elements are returned unchanged.
+
+    Args:
+        xml_tree: An lxml element or element tree of a medline document
+
+    Returns:
+        The PubmedArticle element, or xml_tree if it contains none
+    """
+    if hasattr(xml_tree, "getroot"):
+        xml_tree = xml_tree.getroot()
+    if xml_tree.tag != "PubmedArticle":
+        pubmed_article = xml_tree.find(".//PubmedArticle")
+        if pubmed_article is not None:
+            return pubmed_article
+    return xml_tree
+
+
+def _first(xpath: etree.XPath, node):
+    """Return the first match of a compiled XPath, or None like find()."""
+    matches = xpath(node)
+    return matches[0] if matches else None
+
+
+def _children_by_tag(node) -> Dict[str, Any]:
+    """Index the direct children of a node by tag in one pass.
+
+    Keeps the first child of each tag, matching what find() would return.
+    """
+    children = {}
+    for child in node:
+        children.setdefault(child.tag, child)
+    return children
+
+
+def _child_text(children: Dict[str, Any], tag: str) -> str:
+    """Return the text of an indexed child, "" when missing or empty."""
+    child = children.get(tag)
+    return child.text or "" if child is not None else ""
+
+
+def _date_parts(date) -> Tuple[str, str, str]:
+    """Return the Year, Month and Day text of a date element in one pass."""
+    children = _children_by_tag(date)
+    return (
+        _child_text(children, "Year"),
+        _child_text(children, "Month"),
+        _child_text(children, "Day"),
+    )
+
 
 class BaseExtractor:
     """Base class for XML extractors."""
 
     def stringify_children(self, node) -> str:
-        """Extract and concatenate all text from an XML node and its children.
+        """Extract and concatenate all text from an XML node and its descendants.
 
         Args:
             node: XML node
@@ -21,12 +88,11 @@ class BaseExtractor:
         if node is None:
             return ""
 
-        parts = (
-            [node.text]
-            + list(chain(*([c.text, c.tail] for c in node.getchildren())))
-            + [node.tail]
-        )
-        return "".join(filter(None, parts)).strip()
+        # itertext walks all descendants (e.g. <sup> inside <i>) in C
+        text = "".join(node.itertext())
+        if node.tail:
+            text += node.tail
+        return text.strip()
 
 
 class AbstractExtractor(BaseExtractor):
@@ -36,23 +102,25 @@ class AbstractExtractor(BaseExtractor):
         """Extract abstract text from the XML tree.
 
         Args:
-            xml_tree: The lxml node pointing to a medline document
+            xml_tree: The PubmedArticle element of a medline document, or an
+                ancestor of it (see resolve_pubmed_article)
 
         Returns:
             Dictionary with abstract text and metadata, or None if no abstract
         """
-        article = xml_tree.find(".//MedlineCitation/Article")
+        xml_tree = resolve_pubmed_article(xml_tree)
+        article = _first(_XP_ARTICLE, xml_tree)
         if article is None:
             return None
 
         category = "Label"
         abstract = ""
 
-        if article.find("Abstract/AbstractText") is not None:
+        if abstract_texts := article.findall("Abstract/AbstractText"):
             # Parse structured abstract
-            if len(article.findall("Abstract/AbstractText")) > 1:
+            if len(abstract_texts) > 1:
                 abstract_list = []
-                for abstract_section in article.findall("Abstract/AbstractText"):
+                for abstract_section in abstract_texts:
                     section = abstract_section.attrib.get(category, "")
                     if section != "UNASSIGNED":
                         abstract_list.append("\n")
@@ -62,11 +130,9 @@ class AbstractExtractor(BaseExtractor):
                     abstract_list.append(section_text)
                 abstract = "\n".join(abstract_list)
             else:
-                abstract = (
-                    self.stringify_children(article.find("Abstract/AbstractText")) or ""
-                )
-        elif article.find("Abstract") is not None:
-            abstract = self.stringify_children(article.find("Abstract")) or ""
+                abstract = self.stringify_children(abstract_texts[0]) or ""
+        elif (abstract_node := article.find("Abstract")) is not None:
+            abstract = self.stringify_children(abstract_node) or ""
 
         if not abstract.strip():
             return None
@@ -85,13 +151,15 @@ class ArticleInfoExtractor(BaseExtractor):
         """Extract article IDs from the XML tree.
 
         Args:
-            xml_tree: The lxml node pointing to a medline document
+            xml_tree: The PubmedArticle element of a medline document, or an
+                ancestor of it (see resolve_pubmed_article)
 
         Returns:
             List of dictionaries containing article IDs and their types
         """
+        xml_tree = resolve_pubmed_article(xml_tree)
         article_ids = []
-        article_id_list = xml_tree.findall(".//PubmedData/ArticleIdList/ArticleId")
+        article_id_list = _XP_ARTICLE_IDS(xml_tree)
 
         if article_id_list:
             for article_id in article_id_list:
@@ -108,13 +176,15 @@ class ArticleInfoExtractor(BaseExtractor):
         """Extract keywords from the XML tree.
 
         Args:
-            xml_tree: The lxml node pointing to a medline document
+            xml_tree: The PubmedArticle element of a medline document, or an
+                ancestor of it (see resolve_pubmed_article)
 
         Returns:
             Comma-separated string of keywords
         """
+        xml_tree = resolve_pubmed_article(xml_tree)
         keywords = []
-        keyword_list = xml_tree.findall(".//KeywordList/Keyword")
+        keyword_list = _XP_KEYWORDS(xml_tree)
 
         if keyword_list:
             keywords = [keyword.text or "" for keyword in keyword_list]
@@ -125,28 +195,24 @@ class ArticleInfoExtractor(BaseExtractor):
         """Extract publication history dates from the XML tree.
 
         Args:
-            xml_tree: The lxml node pointing to a medline document
+            xml_tree: The PubmedArticle element of a medline document, or an
+                ancestor of it (see resolve_pubmed_article)
 
         Returns:
             List of dictionaries containing date information
         """
+        xml_tree = resolve_pubmed_article(xml_tree)
         dates = []
-        date_list = xml_tree.findall(".//PubmedData/History/PubMedPubDate")
-
-        if date_list:
-            for date in date_list:
-                year = date.find("Year")
-                month = date.find("Month")
-                day = date.find("Day")
-
-                dates.append(
-                    {
-                        "date_type": date.attrib.get("PubStatus", ""),
-                        "year": year.text or "" if year is not None else "",
-                        "month": month.text or "" if month is not None else "",
-                        "day": day.text or "" if day is not None else "",
-                    }
-                )
+        for date in _XP_HISTORY_DATES(xml_tree):
+            year, month, day = _date_parts(date)
+            dates.append(
+                {
+                    "date_type": date.attrib.get("PubStatus", ""),
+                    "year": year,
+                    "month": month,
+                    "day": day,
+                }
+            )
 
         return dates
 
@@ -154,12 +220,14 @@ class ArticleInfoExtractor(BaseExtractor):
         """Extract article information from the XML tree.
 
         Args:
-            xml_tree: The lxml node pointing to a medline document
+            xml_tree: The PubmedArticle element of a medline document, or an
+                ancestor of it (see resolve_pubmed_article)
 
         Returns:
             Dictionary containing article information
         """
-        article = xml_tree.find(".//MedlineCitation/Article")
+        xml_tree = resolve_pubmed_article(xml_tree)
+        article = _first(_XP_ARTICLE, xml_tree)
         article_info = {}
 
         if article is None:
@@ -167,16 +235,14 @@ class ArticleInfoExtractor(BaseExtractor):
 
         # Get article title
         article_info["title"] = ""
-        if article.find("ArticleTitle") is not None:
-            article_info["title"] = (
-                self.stringify_children(article.find("ArticleTitle")) or ""
-            )
+        if (title := article.find("ArticleTitle")) is not None:
+            article_info["title"] = self.stringify_children(title) or ""
 
         # Get article language
         article_info["languages"] = ""
-        if article.findall("Language"):
+        if languages := article.findall("Language"):
             article_info["languages"] = LIST_SEPERATOR.join(
-                [language.text for language in article.findall("Language")]
+                [language.text for language in languages]
             )
 
         # Get article volume
@@ -210,40 +276,33 @@ class JournalInfoExtractor(BaseExtractor):
         """Extract journal information from the XML tree.
 
         Args:
-            xml_tree: The lxml node pointing to a medline document
+            xml_tree: The PubmedArticle element of a medline document, or an
+                ancestor of it (see resolve_pubmed_article)
 
         Returns:
             Dictionary containing journal information
         """
+        xml_tree = resolve_pubmed_article(xml_tree)
         journal_info = {}
-        journal = xml_tree.find(".//MedlineCitation/Article/Journal")
+        journal = _first(_XP_JOURNAL, xml_tree)
 
         if journal is not None:
-            # Get journal full name
-            title = journal.find("Title")
-            if title is not None:
-                journal_info["fulljournalname"] = title.text or ""
-
-            # Get journal abbreviation
-            abbrev = journal.find("ISOAbbreviation")
-            if abbrev is not None:
-                journal_info["journal_abbrev"] = abbrev.text or ""
+            children = _children_by_tag(journal)
 
-            # Get journal ISSN
-            issn = journal.find("ISSN")
-            if issn is not None:
-                journal_info["issn"] = issn.text or ""
+            # Get journal full name, abbreviation and ISSN
+            for key, tag in (
+                ("fulljournalname", "Title"),
+                ("journal_abbrev", "ISOAbbreviation"),
+                ("issn", "ISSN"),
+            ):
+                if tag in children:
+                    journal_info[key] = _child_text(children, tag)
 
             # Get publication date
-            date = journal.find("JournalIssue/PubDate")
+            issue = children.get("JournalIssue")
+            date = issue.find("PubDate") if issue is not None else None
             if date is not None:
-                year = date.find("Year")
-                month = date.find("Month")
-                day = date.find("Day")
-
-                year_text = year.text or "" if year is not None else ""
-                month_text = month.text or "" if month is not None else ""
-                day_text = day.text or "" if day is not None else ""
+                year_text, month_text, day_text = _date_parts(date)
 
                 if any([year_text, month_text, day_text]):
                     journal_info["pubdate"] = (
@@ -260,28 +319,30 @@ class AuthorExtractor(BaseExtractor):
         """Extract author information from the XML tree.
 
         Args:
-            xml_tree: The lxml node pointing to a medline document
+            xml_tree: The PubmedArticle element of a medline document, or an
+                ancestor of it (see resolve_pubmed_article)
 
         Returns:
             List of dictionaries containing author information
         """
+        xml_tree = resolve_pubmed_article(xml_tree)
         authors = []
-        author_list = xml_tree.findall(".//AuthorList/Author")
+        author_list = _XP_AUTHORS(xml_tree)
 
         if author_list:
             for author in author_list:
-                forename = author.find("ForeName")
-                lastname = author.find("LastName")
-                initials = author.find("Initials")
-                affiliation = author.find("AffiliationInfo/Affiliation")
+                # One pass over the children instead of a find() per field
+                children = _children_by_tag(author)
+                info = children.get("AffiliationInfo")
+                affiliation = info.find("Affiliation") if info is not None else None
 
                 authors.append(
                     {
-                        "first": forename.text or "" if forename is not None else "",
+                        "first": _child_text(children, "ForeName"),
                         "middle": "",
-                        "last": lastname.text or "" if lastname is not None else "",
+                        "last": _child_text(children, "LastName"),
                         "suffix": "",
-                        "initials": initials.text or "" if initials is not None else "",
+                        "initials": _child_text(children, "Initials"),
                         "affiliation": (
                             self.stringify_children(affiliation) or ""
                             if affiliation is not None
@@ -301,15 +362,17 @@ class MeshTermsExtractor(BaseExtractor):
         """
         Parse the mesh terms with subheadings from the XML tree
         Args:
-            xml_tree (Element): The lxml node pointing to a medline document
+            xml_tree (Element): The PubmedArticle element of a medline document,
+                or an ancestor of it (see resolve_pubmed_article)
         Returns:
             str: A string of LIST_SEPERATOR separated mesh terms with subheadings
         """
+        xml_tree = resolve_pubmed_article(xml_tree)
 
-        mesh = xml_tree.find(".//MedlineCitation/MeshHeadingList")
+        mesh = _first(_XP_MESH_HEADING_LIST, xml_tree)
         if mesh is not None:
             mesh_terms_list = []
-            for m in mesh.getchildren():
+            for m in mesh:
                 descriptor_name = m.find("DescriptorName")
                 term = descriptor_name.attrib.get("UI", "") + ":" + descriptor_name.text
                 if descriptor_name.attrib.get("MajorTopicYN", "") == "Y":
@@ -19,30 +19,54 @@ Example:
     >>>     if article is None:
     >>>         continue
     >>>     pmid = article["pmid"]
-    >>>     with open(f"./data/pubmed/pubmed_{pmid}.json", "w") as f:
-    >>>         json.dump(article, f)
+    >>>     pubmed.dump(article, f"./data/pubmed/pubmed_{pmid}.json")
 
 Some code adapted from https://github.com/titipata/pubmed_parser
 """
 
-import gzip
-from typing import Dict, Optional, Any
+import io
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from loguru import logger
 from lxml import etree  # pylint: disable=import-error
-import tiktoken  # pylint: disable=import-error
+import orjson
+
+try:
+    # ISA-L based drop-in replacement for gzip with 2-4x faster decompression
+    from isal.igzip import open as gzip_open  # pylint: disable=import-error
+except ImportError:
+    from gzip import open as gzip_open
 
 # Import from new modules
-from src.api.pubmed_api import get_pubmed_article_xml
+from src.api.pubmed_api import (
+    EFETCH_BATCH_SIZE,
+    get_pubmed_article_xml,
+    get_pubmed_articles_xml,
+)
 from src.extractors.xml_extractors import (
     AbstractExtractor,
     ArticleInfoExtractor,
     JournalInfoExtractor,
     AuthorExtractor,
     MeshTermsExtractor,
+    resolve_pubmed_article,
+)
+from src.utils.article_splitter import (
+    split_article_paragraphs,
+    split_articles_paragraphs,
+)
+from src.utils import detect_sentences
+from src.utils.disk_cache import DiskCache
+from src.api import citation_count, journal_ranking
+from src.api.citation_count import (
+    get_article_citation_count,
+    get_article_citation_counts,
 )
-from src.utils.article_splitter import split_article_paragraphs
-from src.api.citation_count import get_article_citation_count
-from src.api.journal_ranking import get_journal_ranking
+from src.api.journal_ranking import get_journal_ranking, get_journal_rankings
 
 
 class PubmedParser:
@@ -59,6 +83,13 @@ class PubmedParser:
         journal_ranking_bool: Whether to get journal ranking
         journal_ranking_dict: Cache dictionary of journal ranking info
         timeout: Timeout for HTTP requests in seconds
+        cache_dir: Directory of the persistent caches, or None
+        citation_cache: Persistent cache of citation counts, or None
+        journal_ranking_cache: Persistent cache of journal rankings, or None
+        sentence_cache: Persistent cache of detected sentences, or None
+        allowed_languages: Language codes of the articles to build, or None for all
+        allowed_publication_types: Publication types of the articles to build,
+            or None for all
     """
 
     PUBMED_API_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
@@ -71,6 +102,9 @@ class PubmedParser:
         get_citation_count_bool: bool = False,
         get_journal_ranking_bool: bool = False,
         timeout: int = 15,
+        cache_dir: Optional[str] = None,
+        allowed_languages: Optional[Iterable[str]] = None,
+        allowed_publication_types: Optional[Iterable[str]] = None,
     ):
         """Initialize the PubmedParser.
 
@@ -81,6 +115,15 @@ class PubmedParser:
             get_citation_count_bool: Whether to get citation count. Defaults to False.
             get_journal_ranking_bool: Whether to get journal ranking. Defaults to False.
             timeout: Timeout for HTTP requests in seconds. Defaults to 15.
+            cache_dir: Directory for persistent caches of citation counts,
+                journal rankings and detected sentences. Defaults to None
+                (no persistent cache).
+            allowed_languages: Only build articles in one of these languages
+                (e.g. ["eng"]). Other articles are skipped before any splitting
+                or API lookup. Defaults to None (all languages).
+            allowed_publication_types: Only build articles with at least one of
+                these publication types, given as name (e.g. "Journal Article")
+                or UI (e.g. "D016428"). Defaults to None (all types).
         """
         self.max_split_token_length = max_split_token_length
         self.min_split_token_length = min_split_token_length
@@ -89,7 +132,33 @@ class PubmedParser:
         self.journal_ranking_bool = get_journal_ranking_bool
         self.journal_ranking_dict = {}
         self.timeout = timeout
-        self._tokenizer = tiktoken.get_encoding("p50k_base")
+        self.cache_dir = cache_dir
+        self.citation_cache = None
+        self.journal_ranking_cache = None
+        self.sentence_cache = None
+        if cache_dir is not None:
+            self.citation_cache = DiskCache(
+                os.path.join(cache_dir, "crossref.sqlite"),
+                ttl=citation_count.CACHE_TTL,
+                negative_ttl=citation_count.NEGATIVE_CACHE_TTL,
+            )
+            self.journal_ranking_cache = DiskCache(
+                os.path.join(cache_dir, "exaly.sqlite"),
+                ttl=journal_ranking.CACHE_TTL,
+                negative_ttl=journal_ranking.NEGATIVE_CACHE_TTL,
+            )
+            self.sentence_cache = DiskCache(
+                os.path.join(cache_dir, "sentences.sqlite"),
+                ttl=detect_sentences.SENTENCE_DISK_CACHE_TTL,
+            )
+        self.allowed_languages = (
+            None if allowed_languages is None else frozenset(allowed_languages)
+        )
+        self.allowed_publication_types = (
+            None
+            if allowed_publication_types is None
+            else frozenset(allowed_publication_types)
+        )
 
         # Initialize extractors
         self.abstract_extractor = AbstractExtractor()
@@ -97,15 +166,17 @@ class PubmedParser:
         self.journal_info_extractor = JournalInfoExtractor()
         self.author_extractor = AuthorExtractor()
         self.mesh_terms_extractor = MeshTermsExtractor()
+        # Built once, build_pubmed_json iterates it for every article
+        self._components = self._meta_info_components()
 
-    def get_pubmed_article_xml(self, pmid: str) -> Optional[str]:
+    def get_pubmed_article_xml(self, pmid: str) -> Optional[bytes]:
         """Get the PubMed article XML from the PMID.
 
         Args:
             pmid: The PubMed ID of the article
 
         Returns:
-            The XML of the article as a string, or None if retrieval failed
+            The raw XML bytes of the article, or None if retrieval failed
 
         Raises:
             ValueError: If PMID is empty
@@ -113,16 +184,28 @@ class PubmedParser:
         return get_pubmed_article_xml(pmid, self.timeout)
 
     def build_pubmed_json(
-        self, xml_path: Optional[str] = None, xml_tree=None
+        self,
+        xml_path: Optional[str] = None,
+        xml_tree=None,
+        split_article=True,
+        fetch_external=True,
     ) -> Optional[Dict[str, Any]]:
         """Build JSON object for a PubMed article.
 
         Args:
-            xml_path: Path to XML file (optional)
+            xml_path: Path to XML or XML GZ file (optional). Only the first
+                PubmedArticle of the file is parsed.
             xml_tree: XML tree object (optional)
+            split_article: Whether to split the abstract into article_splits.
+                When False, article_splits is left empty so that the splits of
+                several articles can be computed together.
+            fetch_external: Whether to look up the citation count and journal
+                ranking, if enabled. When False they are left out so that the
+                lookups of several articles can be batched.
 
         Returns:
-            Dictionary containing article data, or None if no abstract
+            Dictionary containing article data, or None if the article could not
+            be parsed or is excluded by allowed_languages/allowed_publication_types
 
         Note:
             Either xml_path or xml_tree must be provided
@@ -131,15 +214,27 @@ class PubmedParser:
         # Parse XML if path is provided
         if xml_path is not None:
             try:
-                xml_tree = etree.parse(xml_path)  # type: ignore
+                xml_tree = self._parse_first_article(xml_path)
             except Exception as e:  # type: ignore
-                logger.error(f"Error parsing XML file {xml_path}: {e}")
+                logger.error("Error parsing XML file {}: {}", xml_path, e)
                 return None
 
         if xml_tree is None:
             logger.error("No XML data provided")
             return None
 
+        # Resolve the PubmedArticle once so the extractors skip the lookup
+        xml_tree = resolve_pubmed_article(xml_tree)
+
+        # Skip unwanted articles before any of the expensive work
+        if not self._is_allowed(xml_tree):
+            # Lazy, so the PMID is only looked up when debug logging is on
+            logger.opt(lazy=True).debug(
+                "Skipping PMID {}: language or publication type not allowed",
+                lambda: xml_tree.findtext("MedlineCitation/PMID"),
+            )
+            return None
+
         try:
             # Get abstract
             abstract = self.abstract_extractor.get_abstract(xml_tree)
@@ -171,115 +266,77 @@ class PubmedParser:
                 "pmid": pmid,
             }
 
-            # Add keywords with error handling
-            try:
-                json_output["meta_info"]["kwd"] = (
-                    self.article_info_extractor.get_keywords(xml_tree)
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Error extracting keywords for PMID {pmid or 'unknown'}: {e}"
-                )
-                json_output["meta_info"]["kwd"] = []
-
-            # Add dates history with error handling
-            try:
-                json_output["meta_info"]["dates_history"] = (
-                    self.article_info_extractor.get_dates_history(xml_tree)
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Error extracting dates history for PMID {pmid or 'unknown'}: {e}"
-                )
-                json_output["meta_info"]["dates_history"] = []
-
-            # Add journal info with error handling
-            try:
-                journal_info = self.journal_info_extractor.get_journal_info(xml_tree)
-                json_output["meta_info"].update(journal_info)
-            except Exception as e:
-                logger.warning(
-                    f"Error extracting journal info for PMID {pmid or 'unknown'}: {e}"
-                )
-
-            # Add article info with error handling
-            try:
-                article_info = self.article_info_extractor.get_article_info(xml_tree)
-                json_output["meta_info"].update(article_info)
-            except Exception as e:
-                logger.warning(
-                    f"Error extracting article info for PMID {pmid or 'unknown'}: {e}"
-                )
-
-            # Add authors with error handling
-            try:
-                json_output["meta_info"]["authors"] = self.author_extractor.get_authors(
-                    xml_tree
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Error extracting authors for PMID {pmid or 'unknown'}: {e}"
-                )
-                json_output["meta_info"]["authors"] = []
-
-            # Add mesh terms with error handling
-            try:
-                json_output["meta_info"]["mesh_terms"] = (
-                    self.mesh_terms_extractor.parse_mesh_terms_with_subs(xml_tree)
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Error extracting mesh terms for PMID {pmid or 'unknown'}: {e}"
-                )
-                json_output["meta_info"]["mesh_terms"] = ""
+            # Add the metadata components, a failing one falls back to its default
+            meta_info = json_output["meta_info"]
+            for name, key, extract, default in self._components:
+                try:
+                    value = extract(xml_tree)
+                except Exception as e:
+                    logger.warning(
+                        "Error extracting {} for PMID {}: {}",
+                        name,
+                        pmid or "unknown",
+                        e,
+                    )
+                    value = default()
+                if key is None:
+                    meta_info.update(value)
+                else:
+                    meta_info[key] = value
 
             # Get the article splits with error handling
-            try:
-                json_output["article_splits"] = split_article_paragraphs(
-                    json_output,
-                    self.max_split_token_length,
-                    self.min_split_token_length,
-                    self.sentence_overlap,
-                )
-            except Exception as e:
-                logger.warning(
-                    f"Error splitting article for PMID {pmid or 'unknown'}: {e}"
-                )
-                json_output["article_splits"] = []
+            json_output["article_splits"] = []
+            if split_article:
+                try:
+                    json_output["article_splits"] = split_article_paragraphs(
+                        json_output,
+                        self.max_split_token_length,
+                        self.min_split_token_length,
+                        self.sentence_overlap,
+                        self.sentence_cache,
+                    )
+                except Exception as e:
+                    logger.warning(
+                        "Error splitting article for PMID {}: {}", pmid or "unknown", e
+                    )
 
             # Get the citation count of the article
-            if self.citation_count_bool:
+            if self.citation_count_bool and fetch_external:
                 try:
                     json_output["meta_info"]["citation_count"] = (
-                        get_article_citation_count(doi, pmid)
+                        get_article_citation_count(doi, pmid, self.citation_cache)
                     )
                 except Exception as e:
                     logger.warning(
-                        f"Error getting citation count for PMID {pmid or 'unknown'}: {e}"
+                        "Error getting citation count for PMID {}: {}",
+                        pmid or "unknown",
+                        e,
                     )
                     json_output["meta_info"]["citation_count"] = None
 
             # Get the journal ranking info
-            if self.journal_ranking_bool:
+            if self.journal_ranking_bool and fetch_external:
                 try:
                     journal_name = json_output["meta_info"].get("fulljournalname", "")
-                    json_output["meta_info"]["journal_ranking"] = get_journal_ranking(
-                        journal_name, pmid
+                    json_output["meta_info"]["journal_ranking"] = (
+                        self._get_journal_ranking(journal_name, pmid)
                     )
                 except Exception as e:
                     logger.warning(
-                        f"Error getting journal ranking for PMID {pmid or 'unknown'}: {e}"
+                        "Error getting journal ranking for PMID {}: {}",
+                        pmid or "unknown",
+                        e,
                     )
                     json_output["meta_info"]["journal_ranking"] = None
 
             if abstract["text"] == "":
-                logger.info(f"No abstract found in pubmed article {pmid}")
+                logger.info("No abstract found in pubmed article {}", pmid)
 
             return json_output
 
         except Exception as e:
             logger.error(
-                f"Unexpected error processing XML for PMID {pmid or 'unknown'}: {e}"
+                "Unexpected error processing XML for PMID {}: {}", pmid or "unknown", e
             )
             return None
 
@@ -306,63 +363,601 @@ class PubmedParser:
             logger.error("Empty PMID provided")
             return None
 
-        # Get the XML from PubMed API
-        xml_text = self.get_pubmed_article_xml(pmid)
-        if not xml_text:
-            logger.error(f"Failed to retrieve XML for PMID {pmid}")
-            return None
+        return self.build_pubmed_json_batch([pmid])[0]
 
-        try:
-            # Parse the XML text into an XML tree
-            xml_tree = etree.fromstring(xml_text.encode("utf-8"))
+    def build_pubmed_json_batch(
+        self,
+        pmids: Iterable[str],
+        chunk_size: int = EFETCH_BATCH_SIZE,
+        max_workers: int = 1,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Build JSON objects for several PubMed articles by PMID.
 
-            # Find the PubmedArticle element
-            pubmed_article = xml_tree.find(".//PubmedArticle")
-            if pubmed_article is None:
-                logger.error(f"No PubmedArticle element found in XML for PMID {pmid}")
-                return None
+        The articles are fetched with one EFetch request per chunk_size PMIDs,
+        and the splits of each chunk are tokenized together.
+
+        Args:
+            pmids: PubMed IDs of the articles
+            chunk_size: Maximum number of PMIDs per EFetch request
+            max_workers: Number of worker processes that build the articles of
+                the fetched chunks while the next chunk is downloaded. Defaults
+                to 1 (no workers), which avoids the process start-up cost for
+                small batches.
 
-            # Build the JSON from the XML tree
-            return self.build_pubmed_json(xml_tree=pubmed_article)
+        Returns:
+            List of article dictionaries in the order of the PMIDs, with None
+            for articles that could not be retrieved
+        """
+        # Articles are keyed by their string PMID, so integer PMIDs match too
+        pmids = [str(pmid) if pmid else pmid for pmid in pmids]
+        responses = get_pubmed_articles_xml(pmids, self.timeout, chunk_size)
+
+        if max_workers > 1:
+            with self._worker_pool(max_workers) as executor:
+                futures = [
+                    executor.submit(_build_pubmed_json_set, xml_bytes)
+                    for xml_bytes in responses
+                    if xml_bytes
+                ]
+                built = [article for f in futures for article in f.result()]
+        else:
+            built = [
+                article
+                for xml_bytes in responses
+                if xml_bytes
+                for article in self._build_pubmed_json_set(xml_bytes)
+            ]
+
+        articles = {article["pmid"]: article for article in built if article}
+        missing = [pmid for pmid in pmids if pmid and pmid not in articles]
+        if missing:
+            logger.error(
+                "Failed to retrieve {} articles: {}", len(missing), missing[:10]
+            )
 
-        except Exception as e:
-            logger.error(f"Error parsing XML for PMID {pmid}: {e}")
-            return None
+        return [articles.get(pmid) for pmid in pmids]
 
-    def parse_pubmed_xml_iter(self, path):
+    def parse_pubmed_xml_iter(self, path, batch_size: int = 256):
         """Parse the XML file of the article and yield the JSON object for the article
+
+        Articles are built in batches of batch_size, so that the abstract
+        sentences of a whole batch are tokenized with a single call.
+
         Args:
             path (str): The path to the XML GZ file of the article
+            batch_size: Number of articles whose splits are computed together.
+                Defaults to 256.
         Yields:
             dict: A dictionary containing the JSON object for the article
         """
-        logger.info(f"Starting to parse XML file: {path}")
+        logger.info("Starting to parse XML file: {}", path)
         article_count = 0
         error_count = 0
 
+        # Built articles whose splits are not computed yet
+        batch = []
+        try:
+            for element in self._iter_article_elements(path):
+                try:
+                    res = self.build_pubmed_json(
+                        xml_tree=element, split_article=False, fetch_external=False
+                    )
+                    article_count += 1
+                    if article_count % 100 == 0:
+                        logger.debug("Processed {} articles", article_count)
+                except Exception as e:
+                    error_count += 1
+                    logger.warning("Error processing article: {}", e)
+                    res = None
+
+                batch.append(res)
+                if len(batch) >= batch_size:
+                    full_batch, batch = batch, []
+                    yield from self._complete_articles(full_batch)
+
+            full_batch, batch = batch, []
+            yield from self._complete_articles(full_batch)
+
+            logger.info(
+                "Finished parsing XML file. Processed {} articles with {} errors",
+                article_count,
+                error_count,
+            )
+        except Exception as e:
+            logger.error("Error parsing XML file {}: {}", path, e)
+            # Articles read before the error, e.g. of a truncated file, are kept
+            yield from self._complete_articles(batch)
+            yield None
+
+    def parse_pubmed_xml_iter_parallel(
+        self,
+        path,
+        max_workers: Optional[int] = None,
+        chunk_size: int = 64,
+    ):
+        """Parse the XML file with a pool of worker processes and yield the JSON objects
+
+        The XML is streamed in this process; each PubmedArticle element is
+        serialized to bytes and sent in chunks to worker processes, which build
+        the JSON objects. Results are yielded in the order of the file and at
+        most a few chunks per worker are in flight, so memory stays bounded.
+
+        Args:
+            path (str): The path to the XML GZ file of the article
+            max_workers: Number of worker processes. Defaults to os.cpu_count().
+            chunk_size: Number of articles sent to a worker at once. Defaults to 64.
+        Yields:
+            dict: A dictionary containing the JSON object for the article, or None
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        max_pending = 2 * max_workers
+        logger.info(
+            "Starting to parse XML file: {} with {} worker processes", path, max_workers
+        )
+        article_count = 0
+
         try:
-            with gzip.open(path, "rb") as f:
-                for _, element in etree.iterparse(f, events=("end",)):
-                    if element.tag == "PubmedArticle":
-                        try:
-                            res = self.build_pubmed_json(xml_tree=element)
+            with self._worker_pool(max_workers) as executor:
+                pending = deque()
+                chunk = []
+                parse_error = None
+                elements = self._iter_article_elements(path)
+                while True:
+                    try:
+                        element = next(elements, None)
+                    except Exception as e:
+                        # Still build the articles read before the error, e.g.
+                        # of a truncated file
+                        parse_error = e
+                        element = None
+                    if element is None:
+                        break
+
+                    chunk.append(etree.tostring(element))
+                    if len(chunk) < chunk_size:
+                        continue
+                    pending.append(executor.submit(_build_pubmed_json_chunk, chunk))
+                    chunk = []
+                    while len(pending) >= max_pending:
+                        for res in pending.popleft().result():
                             article_count += 1
-                            if article_count % 100 == 0:
-                                logger.debug(f"Processed {article_count} articles")
                             yield res
-                        except Exception as e:
-                            error_count += 1
-                            logger.warning(f"Error processing article: {e}")
-                            yield None
-                        finally:
-                            element.clear()
+
+                if chunk:
+                    pending.append(executor.submit(_build_pubmed_json_chunk, chunk))
+                while pending:
+                    for res in pending.popleft().result():
+                        article_count += 1
+                        yield res
+
+            if parse_error is not None:
+                logger.error("Error parsing XML file {}: {}", path, parse_error)
+                yield None
+                return
 
             logger.info(
-                (
-                    f"Finished parsing XML file. Processed {article_count} "
-                    "articles with {error_count} errors"
-                )
+                "Finished parsing XML file. Processed {} articles", article_count
             )
         except Exception as e:
-            logger.error(f"Error parsing XML file {path}: {e}")
+            logger.error("Error parsing XML file {}: {}", path, e)
             yield None
+
+    def parse_pubmed_xml_to_jsonl(
+        self,
+        path,
+        output_path,
+        max_workers: int = 1,
+        on_article: Optional[Callable[[Optional[Tuple[str, int]]], None]] = None,
+    ) -> Tuple[int, int]:
+        """Parse the XML file and write the articles to a JSONL file
+
+        Each article is serialized with orjson and written as one line as soon
+        as it is built, so no article is kept in memory after it is written.
+        The whole file is written before the method returns.
+
+        Args:
+            path (str): The path to the XML GZ file of the article
+            output_path (str): The path of the JSONL file to write
+            max_workers: Number of worker processes, see
+                parse_pubmed_xml_iter_parallel. Defaults to 1 (no workers).
+            on_article: Optional callback called after each article with
+                (pmid, byte offset of the line) for a written article, or None
+                for an article that failed or was skipped. Use it to build an
+                index of the file or to report progress.
+        Returns:
+            tuple: (number of written articles, number of failed articles)
+        """
+        if max_workers > 1:
+            articles = self.parse_pubmed_xml_iter_parallel(path, max_workers)
+        else:
+            articles = self.parse_pubmed_xml_iter(path)
+
+        written_count = 0
+        error_count = 0
+        with open(output_path, "wb") as f:
+            for article in articles:
+                entry = None
+                if article is not None:
+                    pmid = article.get("pmid", "")
+                    try:
+                        line = orjson.dumps(article, option=orjson.OPT_APPEND_NEWLINE)
+                    except orjson.JSONEncodeError as e:
+                        logger.error("Error serializing article {}: {}", pmid, e)
+                    else:
+                        entry = (pmid, f.tell())
+                        f.write(line)
+
+                if entry is None:
+                    error_count += 1
+                else:
+                    written_count += 1
+                if on_article is not None:
+                    on_article(entry)
+
+        return written_count, error_count
+
+    def _iter_article_elements(self, path):
+        """Stream the PubmedArticle elements of a gzipped PubMed XML file.
+
+        Only PubmedArticle end events are reported (filtered by libxml2, not in
+        Python). Once the caller moves on, the element is cleared and the
+        already processed siblings are removed from the root, so memory stays
+        constant regardless of the file size.
+
+        Args:
+            path (str): The path to the XML GZ file
+        Yields:
+            The lxml element of each PubmedArticle
+        """
+        with _open_xml(path) as f:
+            for _, element in etree.iterparse(
+                f, events=("end",), tag="PubmedArticle", **_PARSER_OPTIONS
+            ):
+                yield element
+                element.clear(keep_tail=True)
+                while element.getprevious() is not None:
+                    del element.getparent()[0]
+
+    def _is_allowed(self, xml_tree) -> bool:
+        """Check an article against allowed_languages and allowed_publication_types.
+
+        Args:
+            xml_tree: The lxml PubmedArticle element
+
+        Returns:
+            True if the article should be built
+        """
+        if self.allowed_languages is not None:
+            languages = xml_tree.findall("MedlineCitation/Article/Language")
+            if not any(
+                language.text in self.allowed_languages for language in languages
+            ):
+                return False
+
+        if self.allowed_publication_types is not None:
+            publication_types = xml_tree.findall(
+                "MedlineCitation/Article/PublicationTypeList/PublicationType"
+            )
+            if not any(
+                publication_type.text in self.allowed_publication_types
+                or publication_type.get("UI") in self.allowed_publication_types
+                for publication_type in publication_types
+            ):
+                return False
+
+        return True
+
+    @staticmethod
+    def dump(article: Dict[str, Any], path: str) -> None:
+        """Write an article dictionary to a JSON file.
+
+        The article is serialized with orjson, which is several times faster
+        than the standard library json module.
+
+        Args:
+            article: Article dictionary as returned by build_pubmed_json
+            path: Path of the JSON file to write
+        """
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(article))
+
+    def _meta_info_components(self) -> Tuple[Tuple[str, Optional[str], Any, Any], ...]:
+        """Build the table of metadata extractors applied by build_pubmed_json.
+
+        Called once from __init__, the result is kept in _components.
+
+        Returns:
+            Tuples of (name for logging, meta_info key or None to merge the
+            returned dictionary, extractor method, factory of the default value)
+        """
+        article_info = self.article_info_extractor
+        return (
+            ("keywords", "kwd", article_info.get_keywords, list),
+            ("dates history", "dates_history", article_info.get_dates_history, list),
+            ("journal info", None, self.journal_info_extractor.get_journal_info, dict),
+            ("article info", None, article_info.get_article_info, dict),
+            ("authors", "authors", self.author_extractor.get_authors, list),
+            (
+                "mesh terms",
+                "mesh_terms",
+                self.mesh_terms_extractor.parse_mesh_terms_with_subs,
+                str,
+            ),
+        )
+
+    def _get_journal_ranking(self, journal_name: str, pmid: str) -> Dict[str, Any]:
+        """Get the ranking of a journal, memoized in journal_ranking_dict.
+
+        Args:
+            journal_name: The full name of the journal
+            pmid: PubMed ID (used for logging purposes)
+
+        Returns:
+            A copy of the journal ranking info
+        """
+        ranking = self.journal_ranking_dict.get(journal_name)
+        if ranking is None:
+            ranking = get_journal_ranking(
+                journal_name, pmid, self.journal_ranking_cache
+            )
+            self.journal_ranking_dict[journal_name] = ranking
+        return dict(ranking)
+
+    def _complete_articles(
+        self, articles: List[Optional[Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Complete articles built with split_article=False, fetch_external=False.
+
+        The splits are computed together, and the citation counts and journal
+        rankings are looked up concurrently for the whole batch.
+
+        Args:
+            articles: List of article dictionaries, with None for failed articles
+
+        Returns:
+            The same list, with the articles completed in place
+        """
+        self._add_article_splits(articles)
+        built = [article for article in articles if article is not None]
+        if built and self.citation_count_bool:
+            self._add_citation_counts(built)
+        if built and self.journal_ranking_bool:
+            self._add_journal_rankings(built)
+        return articles
+
+    def _add_citation_counts(self, articles: List[Dict[str, Any]]) -> None:
+        """Look up the citation counts of a batch of articles concurrently.
+
+        Args:
+            articles: List of article dictionaries, updated in place
+        """
+        pairs = [(_article_doi(article), article["pmid"]) for article in articles]
+        try:
+            counts = get_article_citation_counts(pairs, cache=self.citation_cache)
+        except Exception as e:
+            logger.warning(
+                "Error getting citation counts of {} articles: {}", len(pairs), e
+            )
+            counts = [None] * len(pairs)
+
+        for article, count in zip(articles, counts):
+            article["meta_info"]["citation_count"] = count
+
+    def _add_journal_rankings(self, articles: List[Dict[str, Any]]) -> None:
+        """Look up the journal rankings of a batch of articles concurrently.
+
+        Journals already in journal_ranking_dict are not looked up again.
+
+        Args:
+            articles: List of article dictionaries, updated in place
+        """
+        names = [
+            article["meta_info"].get("fulljournalname", "") for article in articles
+        ]
+        missing = list(
+            dict.fromkeys(
+                name for name in names if name not in self.journal_ranking_dict
+            )
+        )
+        try:
+            rankings = get_journal_rankings(missing, cache=self.journal_ranking_cache)
+            self.journal_ranking_dict.update(zip(missing, rankings))
+        except Exception as e:
+            logger.warning("Error getting rankings of {} journals: {}", len(missing), e)
+
+        for article, name in zip(articles, names):
+            ranking = self.journal_ranking_dict.get(name)
+            article["meta_info"]["journal_ranking"] = (
+                None if ranking is None else dict(ranking)
+            )
+
+    def _add_article_splits(
+        self, articles: List[Optional[Dict[str, Any]]]
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Add the article splits to articles built with split_article=False.
+
+        Args:
+            articles: List of article dictionaries, with None for failed articles
+
+        Returns:
+            The same list, with article_splits filled in
+        """
+        built = [article for article in articles if article is not None]
+        try:
+            articles_splits = split_articles_paragraphs(
+                built,
+                self.max_split_token_length,
+                self.min_split_token_length,
+                self.sentence_overlap,
+                self.sentence_cache,
+            )
+        except Exception as e:
+            logger.warning("Error splitting a batch of {} articles: {}", len(built), e)
+            articles_splits = [[] for _ in built]
+
+        for article, article_splits in zip(built, articles_splits):
+            article["article_splits"] = article_splits
+        return articles
+
+    def _build_pubmed_json_set(
+        self, xml_bytes: bytes
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Build the JSON objects of the articles in a PubmedArticleSet.
+
+        Args:
+            xml_bytes: Raw XML of a PubmedArticleSet, e.g. an EFetch response
+
+        Returns:
+            List of article dictionaries in document order, with None for
+            articles that failed or were skipped
+        """
+        try:
+            # Parse the XML bytes into an XML tree, lxml reads the declared encoding
+            xml_tree = etree.fromstring(xml_bytes, _xml_parser())
+        except etree.XMLSyntaxError as e:
+            logger.error("Error parsing PubMed XML response: {}", e)
+            return []
+
+        return self._complete_articles(
+            [
+                self.build_pubmed_json(
+                    xml_tree=pubmed_article, split_article=False, fetch_external=False
+                )
+                for pubmed_article in xml_tree.iter("PubmedArticle")
+            ]
+        )
+
+    def _parse_first_article(self, xml_path: str):
+        """Parse the first PubmedArticle of a plain or gzipped XML file.
+
+        The file is streamed and parsing stops at the end of the first article,
+        so a multi-article dump is not loaded into memory as a whole.
+
+        Args:
+            xml_path: Path to the XML (or XML GZ) file
+        Returns:
+            The PubmedArticle element, or the parsed document if the file
+            contains no PubmedArticle element
+        """
+        with _open_xml(xml_path) as f:
+            for _, element in etree.iterparse(
+                f, events=("end",), tag="PubmedArticle", **_PARSER_OPTIONS
+            ):
+                return element
+
+        return etree.parse(xml_path, _xml_parser())
+
+    def _worker_pool(self, max_workers: int) -> ProcessPoolExecutor:
+        """Create a process pool whose workers each build a parser like this one.
+
+        With the fork start method the sentence segmenter is loaded here first,
+        so the workers share it instead of each loading their own copy.
+
+        Args:
+            max_workers: Number of worker processes
+
+        Returns:
+            The process pool executor
+        """
+        if multiprocessing.get_start_method() == "fork":
+            detect_sentences.load_segmenter()
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self._worker_config(),),
+        )
+
+    def _worker_config(self) -> Dict[str, Any]:
+        """Get the constructor arguments used to rebuild this parser in a worker."""
+        return {
+            "max_split_token_length": self.max_split_token_length,
+            "min_split_token_length": self.min_split_token_length,
+            "sentence_overlap": self.sentence_overlap,
+            "get_citation_count_bool": self.citation_count_bool,
+            "get_journal_ranking_bool": self.journal_ranking_bool,
+            "timeout": self.timeout,
+            "cache_dir": self.cache_dir,
+            "allowed_languages": self.allowed_languages,
+            "allowed_publication_types": self.allowed_publication_types,
+        }
+
+
+_THREAD_LOCAL = threading.local()
+
+# PubMed records do not use XML IDs or entities, so neither the ID table nor
+# entity resolution is needed. Blank text is kept, it is part of mixed content.
+_PARSER_OPTIONS = {"collect_ids": False, "resolve_entities": False}
+
+
+def _xml_parser() -> etree.XMLParser:
+    """Get the reusable XML parser of the current thread.
+
+    The parser uses _PARSER_OPTIONS. lxml parsers must not be shared across
+    threads, hence one parser per thread.
+    """
+    parser = getattr(_THREAD_LOCAL, "xml_parser", None)
+    if parser is None:
+        parser = etree.XMLParser(**_PARSER_OPTIONS)
+        _THREAD_LOCAL.xml_parser = parser
+    return parser
+
+
+# Read the decompressed stream in large blocks instead of many small reads
+READ_BUFFER_SIZE = 1 << 20
+
+
+def _open_xml(path: str):
+    """Open a plain or gzipped (.gz) XML file for binary reading."""
+    if path.endswith(".gz"):
+        return io.BufferedReader(gzip_open(path, "rb"), buffer_size=READ_BUFFER_SIZE)
+    return open(path, "rb", buffering=READ_BUFFER_SIZE)
+
+
+def _article_doi(article: Dict[str, Any]) -> str:
+    """Get the DOI of an article dictionary, or "" if it has none."""
+    doi = ""
+    for id_item in article["meta_info"].get("articleids", []):
+        if id_item["idtype"] == "doi":
+            doi = id_item["value"]
+    return doi
+
+
+# Parser instance of a worker process, created once by _init_worker
+_WORKER_PARSER: Optional[PubmedParser] = None
+
+
+def _init_worker(config: Dict[str, Any]) -> None:
+    """Create the PubmedParser and sentence segmenter used by a worker process."""
+    global _WORKER_PARSER  # pylint: disable=global-statement
+    _WORKER_PARSER = PubmedParser(**config)
+    detect_sentences.load_segmenter()
+
+
+def _build_pubmed_json_chunk(xml_chunk: List[bytes]) -> List[Optional[Dict[str, Any]]]:
+    """Build the JSON objects for a chunk of serialized PubmedArticle elements.
+
+    Args:
+        xml_chunk: List of PubmedArticle elements serialized with etree.tostring
+
+    Returns:
+        List of article dictionaries, with None for articles that failed
+    """
+    results = []
+    for xml_bytes in xml_chunk:
+        try:
+            results.append(
+                _WORKER_PARSER.build_pubmed_json(
+                    xml_tree=etree.fromstring(xml_bytes, _xml_parser()),
+                    split_article=False,
+                    fetch_external=False,
+                )
+            )
+        except Exception as e:
+            logger.warning("Error processing article: {}", e)
+            results.append(None)
+    return _WORKER_PARSER._complete_articles(results)
+
+
+def _build_pubmed_json_set(xml_bytes: bytes) -> List[Optional[Dict[str, Any]]]:
+    """Build the JSON objects of a PubmedArticleSet in a worker process."""
+    return _WORKER_PARSER._build_pubmed_json_set(xml_bytes)
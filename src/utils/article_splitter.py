@@ -1,14 +1,27 @@
 """Module for splitting articles into smaller chunks."""
 
-from typing import List
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
 from loguru import logger
 
-import tiktoken  # type: ignore
+from src.utils.detect_sentences import get_sentences_batch
+from src.utils.disk_cache import DiskCache
+from src.utils.tokenizer import get_tokenizer
 
-from src.utils.detect_sentences import get_sentences
+# tiktoken starts a thread pool for every batch call, which only pays off for
+# long sentence lists; shorter lists are encoded one sentence at a time
+BATCH_ENCODE_MIN_SENTENCES = 64
 
-# Initialize tokenizer
-_tokenizer = tiktoken.get_encoding("p50k_base")
+# Token lengths of recently seen sentences. Boilerplate such as copyright or
+# conflict of interest statements recurs across a dump; the cache is emptied
+# once it would exceed SENTENCE_CACHE_SIZE entries to keep memory bounded.
+SENTENCE_CACHE_SIZE = 65536
+_TOKEN_LENGTH_CACHE: Dict[str, int] = {}
+
+# A token is at least this many characters on average for English text, so a
+# section shorter than max tokens times this is worth a single exact encode
+MIN_CHARS_PER_TOKEN = 3
 
 
 def split_article_paragraphs(
@@ -16,6 +29,7 @@ def split_article_paragraphs(
     max_split_token_length=500,
     min_split_token_length=100,
     sentence_overlap=2,
+    sentence_cache: Optional[DiskCache] = None,
 ):
     """Split article paragraphs into smaller chunks.
 
@@ -24,60 +38,205 @@ def split_article_paragraphs(
         max_split_token_length: Maximum number of tokens in a split
         min_split_token_length: Minimum number of tokens in a split
         sentence_overlap: Number of sentences to overlap between splits
+        sentence_cache: Optional persistent cache of detected sentences
 
     Returns:
         List of dictionaries containing split paragraphs
     """
-    article_splits = []
+    return split_articles_paragraphs(
+        [article_json],
+        max_split_token_length,
+        min_split_token_length,
+        sentence_overlap,
+        sentence_cache,
+    )[0]
 
-    # Get abstract text
-    abstract_sections = article_json.get("abstract", [])
-    if not abstract_sections:
-        logger.warning(
-            f"No abstract found for article {article_json.get('pmid', 'unknown')}"
-        )
-        return article_splits
 
+def split_articles_paragraphs(
+    articles_json: List[Dict[str, Any]],
+    max_split_token_length=500,
+    min_split_token_length=100,
+    sentence_overlap=2,
+    sentence_cache: Optional[DiskCache] = None,
+) -> List[List[Dict[str, Any]]]:
+    """Split the paragraphs of several articles into smaller chunks.
+
+    The sentences of all articles are detected and tokenized with a single
+    call each, so that batches of articles make use of spaCy's nlp.pipe and
+    the batch encoder.
+
+    Args:
+        articles_json: List of dictionaries containing article data
+        max_split_token_length: Maximum number of tokens in a split
+        min_split_token_length: Minimum number of tokens in a split
+        sentence_overlap: Number of sentences to overlap between splits
+        sentence_cache: Optional persistent cache of detected sentences
+
+    Returns:
+        List with the split paragraphs of each article, in input order
+    """
+    # Sentences of each abstract section, as (section, sentences) per article
+    articles_sections = _get_section_sentences(
+        articles_json, max_split_token_length, sentence_cache
+    )
+
+    all_sentences = [
+        sentence
+        for sections in articles_sections
+        for _, sentences in sections
+        for sentence in sentences
+    ]
     try:
-        # Process each abstract section
-        for section in abstract_sections:
-            section_text = section.get("text", "")
-            if not section_text:
-                continue
+        all_lengths = _token_lengths(all_sentences)
+    except Exception as e:
+        logger.error("Error tokenizing article sentences: {}", e)
+        return [[] for _ in articles_json]
+
+    articles_splits = []
+    offset = 0
+    for sections in articles_sections:
+        article_splits = []
+        try:
+            for section, sentences in sections:
+                sentence_lengths = all_lengths[offset : offset + len(sentences)]
+                offset += len(sentences)
+
+                # Split sentences into chunks
+                chunks = _split_sentences_into_chunks(
+                    sentences,
+                    max_split_token_length,
+                    min_split_token_length,
+                    sentence_overlap,
+                    sentence_lengths,
+                )
 
-            # Get sentences from section text
-            sentences = get_sentences(section_text)
+                # Create article splits
+                for i, chunk in enumerate(chunks):
+                    article_splits.append(
+                        {
+                            "text": chunk,
+                            "section_title": section.get("section_title", ""),
+                            "section_type": section.get("section_type", ""),
+                            "split_number": i + 1,
+                            "total_splits": len(chunks),
+                        }
+                    )
+
+            logger.debug("Created {} article splits", len(article_splits))
+        except Exception as e:
+            logger.error("Error splitting article paragraphs: {}", e)
+            article_splits = []
+        articles_splits.append(article_splits)
+
+    return articles_splits
+
+
+def _get_section_sentences(
+    articles_json: List[Dict[str, Any]],
+    max_token_length: Optional[int] = None,
+    sentence_cache: Optional[DiskCache] = None,
+) -> List[List[Tuple[Dict[str, Any], List[str]]]]:
+    """Get the sentences of each abstract section of several articles.
+
+    The sections of all articles go through one get_sentences_batch call. A
+    section that fits in a single split is kept whole as one sentence, its
+    sentences joined the way the chunker joins them, which skips encoding the
+    sentences one by one since their boundaries would not change the split.
+
+    Args:
+        articles_json: List of dictionaries containing article data
+        max_token_length: Maximum number of tokens in a split. If not given,
+            sentences are detected for every section.
+        sentence_cache: Optional persistent cache of detected sentences
+
+    Returns:
+        List with the (section, sentences) tuples of each article, for the
+        sections with sentences, in input order
+    """
+    # Per article a list of [section, sentences, whole]; sentences is filled in
+    # once the section has been through sentence detection, whole marks the
+    # sections that fit in one split
+    articles_sections: List[List[List[Any]]] = []
+    pending_sections: List[List[Any]] = []
+    for article_json in articles_json:
+        sections: List[List[Any]] = []
+        articles_sections.append(sections)
+
+        # Get abstract text
+        abstract_sections = article_json.get("abstract", [])
+        if not abstract_sections:
+            logger.warning(
+                "No abstract found for article {}", article_json.get("pmid", "unknown")
+            )
+            continue
+
+        try:
+            # Process each abstract section
+            for section in abstract_sections:
+                section_text = section.get("text", "")
+                if not section_text:
+                    continue
+
+                text = section_text.strip()
+                whole = bool(
+                    max_token_length is not None
+                    and text
+                    and _fits_in_one_split(text, max_token_length)
+                )
+                entry = [section, None, whole]
+                sections.append(entry)
+                pending_sections.append(entry)
+        except Exception as e:
+            logger.error("Error splitting article paragraphs: {}", e)
+            sections.clear()
+
+    # Get sentences from the section texts of all articles at once
+    if pending_sections:
+        pending_sentences = get_sentences_batch(
+            [section["text"] for section, _, _ in pending_sections],
+            cache=sentence_cache,
+        )
+        for entry, sentences in zip(pending_sections, pending_sentences):
+            # The same text the chunker would make of the section's sentences
+            entry[1] = [" ".join(sentences)] if entry[2] and sentences else sentences
+
+    section_sentences = []
+    for sections in articles_sections:
+        kept = []
+        for section, sentences, _ in sections:
             if not sentences:
                 logger.warning(
-                    f"No sentences found in section: {section.get('section_title', 'Unknown')}"
+                    "No sentences found in section: {}",
+                    section.get("section_title", "Unknown"),
                 )
                 continue
+            kept.append((section, sentences))
+        section_sentences.append(kept)
 
-            # Split sentences into chunks
-            chunks = _split_sentences_into_chunks(
-                sentences,
-                max_split_token_length,
-                min_split_token_length,
-                sentence_overlap,
-            )
+    return section_sentences
 
-            # Create article splits
-            for i, chunk in enumerate(chunks):
-                article_splits.append(
-                    {
-                        "text": chunk,
-                        "section_title": section.get("section_title", ""),
-                        "section_type": section.get("section_type", ""),
-                        "split_number": i + 1,
-                        "total_splits": len(chunks),
-                    }
-                )
 
-        logger.debug(f"Created {len(article_splits)} article splits")
-        return article_splits
-    except Exception as e:
-        logger.error(f"Error splitting article paragraphs: {e}")
-        return []
+def _fits_in_one_split(text: str, max_token_length: int) -> bool:
+    """Check whether a text is at most max_token_length tokens long.
+
+    Texts that are clearly too long by their character count are rejected, and
+    texts with at most max_token_length UTF-8 bytes are accepted, without being
+    encoded. Otherwise the length goes through the token length cache, so the
+    later length lookup of a kept section does not encode it again.
+
+    Args:
+        text: The text to check
+        max_token_length: Maximum number of tokens
+
+    Returns:
+        True if the text fits in a single split
+    """
+    if len(text) // MIN_CHARS_PER_TOKEN >= max_token_length:
+        return False
+    # Every token covers at least one byte, so this bounds the token count
+    if len(text.encode("utf-8")) <= max_token_length:
+        return True
+    return _token_lengths([text])[0] <= max_token_length
 
 
 def _split_sentences_into_chunks(
@@ -85,6 +244,7 @@ def _split_sentences_into_chunks(
     max_token_length: int,
     min_token_length: int,
     sentence_overlap: int,
+    sentence_lengths: Optional[List[int]] = None,
 ) -> List[str]:
     """Split sentences into chunks based on token length.
 
@@ -93,6 +253,7 @@ def _split_sentences_into_chunks(
         max_token_length: Maximum number of tokens in a chunk
         min_token_length: Minimum number of tokens in a chunk
         sentence_overlap: Number of sentences to overlap between chunks
+        sentence_lengths: Token length of each sentence. Computed if not given.
 
     Returns:
         List of text chunks
@@ -100,35 +261,105 @@ def _split_sentences_into_chunks(
     if not sentences:
         return []
 
-    chunks = []
-    current_chunk = []
-    current_length = 0
+    if sentence_lengths is None:
+        sentence_lengths = _token_lengths(sentences)
+
+    # Each chunk string is built exactly once, from its sentence boundaries
+    return [
+        " ".join(sentences[start:end])
+        for start, end in _chunk_boundaries(
+            sentence_lengths, max_token_length, min_token_length, sentence_overlap
+        )
+    ]
+
+
+def _chunk_boundaries(
+    sentence_lengths: List[int],
+    max_token_length: int,
+    min_token_length: int,
+    sentence_overlap: int,
+) -> List[Tuple[int, int]]:
+    """Compute the chunks of a list of sentences from their token lengths.
+
+    Args:
+        sentence_lengths: Token length of each sentence
+        max_token_length: Maximum number of tokens in a chunk
+        min_token_length: Minimum number of tokens in a chunk
+        sentence_overlap: Number of sentences to overlap between chunks
+
+    Returns:
+        List of (start, end) sentence index ranges, one per chunk
+    """
+    num_sentences = len(sentence_lengths)
+    if not num_sentences:
+        return []
 
-    for _, sentence in enumerate(sentences):
-        # Get token length of sentence
-        sentence_tokens = len(_tokenizer.encode(sentence))
+    # cumulative[i] is the token length of sentences[:i], so the length of
+    # the chunk sentences[start:end] is cumulative[end] - cumulative[start]
+    cumulative = [0, *accumulate(sentence_lengths)]
 
-        # If adding this sentence would exceed max length and we have enough content,
-        # finalize the current chunk and start a new one
-        if (
-            current_length + sentence_tokens > max_token_length
-            and current_length >= min_token_length
-            and current_chunk
-        ):
+    boundaries = []
+    start = 0  # First sentence of the current chunk
+    position = 0  # Next sentence to add to the current chunk
 
-            chunks.append(" ".join(current_chunk))
+    while True:
+        # A chunk is finalized before the first sentence that would exceed the
+        # max length, but only once it has enough content and is not empty
+        lower = max(position, start + 1)
+        overflow = bisect_right(cumulative, cumulative[start] + max_token_length) - 1
+        long_enough = bisect_left(
+            cumulative, cumulative[start] + min_token_length, lo=lower
+        )
+        end = max(overflow, long_enough, lower)
+        if end >= num_sentences:
+            break
 
-            # Start new chunk with overlap
-            overlap_start = max(0, len(current_chunk) - sentence_overlap)
-            current_chunk = current_chunk[overlap_start:]
-            current_length = sum(len(_tokenizer.encode(s)) for s in current_chunk)
+        boundaries.append((start, end))
 
-        # Add sentence to current chunk
-        current_chunk.append(sentence)
-        current_length += sentence_tokens
+        # Start new chunk with overlap, followed by the sentence at end
+        start = max(start, end - sentence_overlap)
+        position = end + 1
 
     # Add the last chunk if it's not empty
-    if current_chunk and current_length >= min_token_length:
-        chunks.append(" ".join(current_chunk))
+    if cumulative[num_sentences] - cumulative[start] >= min_token_length:
+        boundaries.append((start, num_sentences))
+
+    return boundaries
+
+
+def _token_lengths(sentences: List[str]) -> List[int]:
+    """Get the token length of each sentence.
+
+    Only sentences missing from the token length cache are encoded, each
+    distinct sentence once. Special token text such as "<|endoftext|>" is
+    encoded as ordinary text.
+
+    Args:
+        sentences: List of sentences
+
+    Returns:
+        List of token lengths in the same order as the sentences
+    """
+    lengths = {}
+    missing = []
+    for sentence in dict.fromkeys(sentences):
+        length = _TOKEN_LENGTH_CACHE.get(sentence)
+        if length is None:
+            missing.append(sentence)
+        else:
+            lengths[sentence] = length
+
+    if missing:
+        encoder = get_tokenizer()
+        if len(missing) >= BATCH_ENCODE_MIN_SENTENCES:
+            tokens = encoder.encode_ordinary_batch(missing)
+        else:
+            tokens = [encoder.encode_ordinary(sentence) for sentence in missing]
+        missing_lengths = dict(zip(missing, map(len, tokens)))
+
+        lengths.update(missing_lengths)
+        if len(_TOKEN_LENGTH_CACHE) + len(missing_lengths) > SENTENCE_CACHE_SIZE:
+            _TOKEN_LENGTH_CACHE.clear()
+        _TOKEN_LENGTH_CACHE.update(missing_lengths)
 
-    return chunks
+    return [lengths[sentence] for sentence in sentences]
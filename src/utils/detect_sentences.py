@@ -1,27 +1,183 @@
-"""This module contains functions for detecting sentences in text using spaCy."""
+"""This module contains functions for detecting sentences in text.
 
-from typing import List
+Sentences are detected with pysbd when it is installed, otherwise with spaCy.
+"""
+
+import hashlib
+import multiprocessing
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from loguru import logger
 
-import spacy  # type: ignore
+from src.utils.disk_cache import DiskCache
+
+# spaCy pipeline used for sentence detection. By default a blank English
+# pipeline with the rule-based sentencizer is used, which needs no model
+# download. Set PUBMED_SPACY_MODEL to a trained model such as en_core_web_sm
+# to detect sentences with its statistical senter component instead.
+SPACY_MODEL = os.environ.get("PUBMED_SPACY_MODEL", "")
+
+# Thread pool variables of the BLAS libraries NumPy may be linked against
+_BLAS_THREAD_VARIABLES = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
 
+if SPACY_MODEL:
+    # A trained model runs its network through NumPy, whose BLAS starts one
+    # thread per core in every process. With nlp.pipe(n_process=...) or parser
+    # worker processes that oversubscribes the CPUs, so BLAS is pinned to one
+    # thread unless already configured. The variables are read when NumPy is
+    # first imported, so callers overriding them must set them before that.
+    for variable in _BLAS_THREAD_VARIABLES:
+        os.environ.setdefault(variable, "1")
+
+import spacy  # type: ignore  # pylint: disable=wrong-import-position
 
-# Load spaCy model once at module level
 try:
-    # check if model is installed, if not install it
-    if "en_core_web_sm" not in spacy.util.get_installed_models():
-        logger.info("Downloading spaCy model 'en_core_web_sm'")
-        spacy.cli.download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
-    logger.debug("Successfully loaded spaCy model 'en_core_web_sm'")
-except Exception as e:
-    logger.error(f"Failed to load spaCy model: {e}")
-    logger.warning("Using blank English model as fallback")
+    # Rule-based segmenter that handles abbreviations such as "et al." or "Fig."
+    import pysbd  # pylint: disable=import-error
+except ImportError:
+    pysbd = None
+
+# Set PUBMED_USE_SPACY=1 to detect sentences with spaCy even if pysbd is installed
+USE_SPACY = pysbd is None or os.environ.get("PUBMED_USE_SPACY", "") == "1"
+
+# Maximum text length in characters the rule-based sentencizer accepts. It
+# keeps little state per character, so spaCy's 1M default guard can safely be
+# raised; trained models keep the default since their memory grows with the
+# text length.
+SPACY_MAX_LENGTH = int(os.environ.get("PUBMED_SPACY_MAX_LENGTH", "2000000"))
+
+# Texts longer than this many characters are segmented in windows split at
+# paragraph breaks, which bounds the memory of a single doc well below the
+# max_length guard. Sentences do not cross paragraph breaks, so the windows
+# give the same sentences except where a window split has to fall back to
+# whitespace inside a very long paragraph.
+SENTENCE_WINDOW_LENGTH = 200_000
+
+# Only sentence boundaries are used, so the components of a trained model
+# producing tags, lemmas, entities and dependency parses are not even loaded
+SPACY_EXCLUDED_COMPONENTS = ["tagger", "attribute_ruler", "lemmatizer", "ner", "parser"]
+
+
+def _blank_sentencizer():
+    """Create a blank English pipeline with the rule-based sentencizer."""
     nlp = spacy.blank("en")
+    nlp.add_pipe("sentencizer")
+    return nlp
+
+
+def _use_sentence_recognizer(nlp):
+    """Set up a loaded pipeline to only detect sentence boundaries.
+
+    Enables the trained senter component, which en_core_web_sm ships disabled,
+    or adds the rule-based sentencizer if the model has none. A tok2vec layer
+    that no remaining component listens to is removed.
+
+    Args:
+        nlp: The loaded spaCy pipeline
+    """
+    if "senter" in nlp.component_names:
+        nlp.enable_pipe("senter")
+    elif not nlp.has_pipe("sentencizer"):
+        nlp.add_pipe("sentencizer")
+
+    if nlp.has_pipe("tok2vec") and not nlp.get_pipe("tok2vec").listening_components:
+        nlp.remove_pipe("tok2vec")
+
+
+def _load_pipeline(model: str):
+    """Load the spaCy pipeline used for sentence detection.
+
+    Args:
+        model: Name of a trained spaCy model, or an empty string for the
+            rule-based sentencizer
+
+    Returns:
+        The spaCy pipeline
+    """
+    if not model:
+        return _blank_sentencizer()
+
+    try:
+        # check if model is installed, if not install it
+        if model not in spacy.util.get_installed_models():
+            logger.info(f"Downloading spaCy model '{model}'")
+            spacy.cli.download(model)
+        nlp = spacy.load(model, exclude=SPACY_EXCLUDED_COMPONENTS)
+        _use_sentence_recognizer(nlp)
+        logger.debug(f"Successfully loaded spaCy model '{model}': {nlp.pipe_names}")
+        return nlp
+    except Exception as e:
+        logger.error(f"Failed to load spaCy model: {e}")
+        logger.warning("Using rule-based sentencizer as fallback")
+        return _blank_sentencizer()
+
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """Get the shared spaCy pipeline, loaded on first use and reused afterwards.
+
+    Imports of the package and runs that detect sentences with pysbd never
+    load it.
+
+    Returns:
+        The SPACY_MODEL pipeline, or the rule-based sentencizer
+    """
+    nlp = _load_pipeline(SPACY_MODEL)
+    if nlp.pipe_names == ["sentencizer"]:
+        nlp.max_length = SPACY_MAX_LENGTH
+    return nlp
+
+
+@lru_cache(maxsize=None)
+def _get_segmenter():
+    """Get the shared pysbd segmenter, created on first use."""
+    return pysbd.Segmenter(language="en", clean=False)
+
+
+def load_segmenter() -> None:
+    """Load the sentence segmenter of this process ahead of its first use.
+
+    Loading it before worker processes are forked lets them share the loaded
+    pipeline copy-on-write; worker initializers call it so that a spawned
+    worker loads it once up front instead of during its first task.
+    """
+    if USE_SPACY:
+        get_nlp()
+    else:
+        _get_segmenter()
+
+
+# Number of texts spaCy processes per batch in get_sentences_batch
+SPACY_BATCH_SIZE = int(os.environ.get("PUBMED_SPACY_BATCH_SIZE", "64"))
+
+# Number of processes nlp.pipe uses, -1 for one per CPU. Forking and sending
+# docs between processes only pays off when a trained model does the work; the
+# rule-based sentencizer is an order of magnitude slower with several
+# processes. Without PUBMED_SPACY_N_PROCESS, a trained model running in the
+# main process uses all CPUs for more than SPACY_MULTIPROCESS_MIN_TEXTS texts.
+SPACY_N_PROCESS = os.environ.get("PUBMED_SPACY_N_PROCESS")
+SPACY_MULTIPROCESS_MIN_TEXTS = 512
+
+# Sentences of recently seen texts. Abstract sections are split again for every
+# split configuration and boilerplate sections recur across a dump; the cache
+# is emptied once it would exceed SENTENCE_CACHE_SIZE entries, and texts longer
+# than SENTENCE_CACHE_MAX_TEXT_LENGTH characters are not cached at all.
+SENTENCE_CACHE_SIZE = 4096
+SENTENCE_CACHE_MAX_TEXT_LENGTH = 32768
+_SENTENCE_CACHE: Dict[str, Tuple[str, ...]] = {}
+
+# Detected sentences only change with the segmenter, so persistent entries are
+# kept for a year. Keys are prefixed with the segmenter that produced them.
+SENTENCE_DISK_CACHE_TTL = 365 * 24 * 3600
+
+# Maps the sentence-ending punctuation of the fallback splitter to ".", so that
+# a plain str.split finds every sentence end; twice as fast as a regex split
+_SENTENCE_END_TABLE = str.maketrans({"!": ".", "?": "."})
 
 
 def get_sentences(text: str) -> List[str]:
-    """Extract sentences from text using spaCy.
+    """Extract sentences from text using pysbd or spaCy.
 
     Args:
         text: The text to extract sentences from
@@ -33,20 +189,201 @@ def get_sentences(text: str) -> List[str]:
         >>> get_sentences("Hello world. This is a test.")
         ['Hello world.', 'This is a test.']
     """
-    if not text or not isinstance(text, str):
-        logger.warning(f"Invalid input text: {type(text)}")
-        return []
+    return get_sentences_batch([text])[0]
+
+
+def get_sentences_batch(
+    texts: List[str],
+    batch_size: int = SPACY_BATCH_SIZE,
+    n_process: Optional[int] = None,
+    cache: Optional[DiskCache] = None,
+) -> List[List[str]]:
+    """Extract the sentences of several texts at once.
+
+    Only texts missing from the sentence cache, and from the persistent cache
+    if given, go through sentence detection, each distinct text once.
+
+    Args:
+        texts: The texts to extract sentences from
+        batch_size: Number of texts spaCy processes per batch
+        n_process: Number of processes spaCy uses. Defaults to
+            PUBMED_SPACY_N_PROCESS, or is chosen from the number of texts.
+        cache: Optional persistent cache of detected sentences
+
+    Returns:
+        List with the sentences of each text, in input order
+    """
+    valid = []
+    for text in texts:
+        if not text or not isinstance(text, str):
+            logger.warning("Invalid input text: {}", type(text))
+            continue
+        valid.append(text)
+
+    sentences_by_text = {}
+    missing = []
+    for text in dict.fromkeys(valid):
+        sentences = _SENTENCE_CACHE.get(text)
+        if sentences is None:
+            missing.append(text)
+        else:
+            sentences_by_text[text] = sentences
+
+    # Sentences to store in the in-memory cache
+    detected = {}
+    keys = {}
+    if missing and cache is not None:
+        keys = {text: _disk_cache_key(text) for text in missing}
+        uncached = []
+        for text in missing:
+            found, sentences = cache.get(keys[text])
+            if found:
+                detected[text] = tuple(sentences)
+            else:
+                uncached.append(text)
+        missing = uncached
+
+    if missing:
+        segmented, fell_back = _detect_missing_sentences(missing, batch_size, n_process)
+        sentences_by_text.update(segmented)
+        # Fallback splits stand in for a transient pipeline failure and are
+        # not cached, so the texts are segmented again once the pipeline works
+        if not fell_back:
+            if cache is not None:
+                cache.set_many((keys[text], list(segmented[text])) for text in missing)
+            detected.update(segmented)
+
+    if detected:
+        sentences_by_text.update(detected)
+
+        cacheable = {
+            text: sentences
+            for text, sentences in detected.items()
+            if len(text) <= SENTENCE_CACHE_MAX_TEXT_LENGTH
+        }
+        if len(_SENTENCE_CACHE) + len(cacheable) > SENTENCE_CACHE_SIZE:
+            _SENTENCE_CACHE.clear()
+        _SENTENCE_CACHE.update(cacheable)
+
+    return [
+        list(sentences_by_text[text]) if text and isinstance(text, str) else []
+        for text in texts
+    ]
+
+
+def _detect_missing_sentences(
+    texts: List[str], batch_size: int, n_process: Optional[int]
+) -> Tuple[Dict[str, Tuple[str, ...]], bool]:
+    """Detect the sentences of distinct texts missing from the caches.
+
+    Returns:
+        Tuple of the sentences by text and whether the fallback splitter
+        was used
+    """
+    if n_process is None:
+        n_process = _spacy_n_process(len(texts))
+    results, fell_back = _detect_sentences(texts, batch_size, n_process)
+    return dict(zip(texts, results)), fell_back
+
+
+def _disk_cache_key(text: str) -> str:
+    """Get the persistent cache key of a text for the current segmenter."""
+    segmenter = "pysbd" if not USE_SPACY else SPACY_MODEL or "sentencizer"
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+    return f"{segmenter}:{digest}"
+
+
+def _spacy_n_process(n_texts: int) -> int:
+    """Choose the number of processes nlp.pipe uses for n_texts texts."""
+    if SPACY_N_PROCESS is not None:
+        return int(SPACY_N_PROCESS)
+    if (
+        USE_SPACY
+        and SPACY_MODEL
+        and n_texts > SPACY_MULTIPROCESS_MIN_TEXTS
+        # Parser worker processes already use all CPUs between them
+        and multiprocessing.parent_process() is None
+    ):
+        return -1
+    return 1
+
+
+def _detect_sentences(
+    texts: List[str], batch_size: int, n_process: int = 1
+) -> Tuple[List[Tuple[str, ...]], bool]:
+    """Detect the sentences of non-empty texts with pysbd or spaCy.
+
+    With spaCy, nlp.pipe processes the texts in batches, which avoids the
+    per-call overhead of running the pipeline on each text separately. pysbd
+    segments the texts one by one. Texts longer than SENTENCE_WINDOW_LENGTH
+    are segmented window by window. If the segmenter raises, all texts are
+    split with _simple_sentence_split instead.
+
+    Args:
+        texts: The texts to extract sentences from
+        batch_size: Number of texts spaCy processes per batch
+        n_process: Number of processes spaCy uses
+
+    Returns:
+        Tuple of a list with a tuple of the sentences of each text, in input
+        order, and whether the fallback splitter was used
+    """
+    # Index of the text each window belongs to
+    windows = []
+    owners = []
+    for i, text in enumerate(texts):
+        for window in _text_windows(text, SENTENCE_WINDOW_LENGTH):
+            windows.append(window)
+            owners.append(i)
 
     try:
-        doc = nlp(text)
-        sentences = [sent.text.strip() for sent in doc.sents if sent.text.strip()]
-        logger.debug(f"Extracted {len(sentences)} sentences from text")
-        return sentences
+        if not USE_SPACY:
+            segmenter = _get_segmenter()
+            segmented = (segmenter.segment(window) for window in windows)
+        else:
+            docs = get_nlp().pipe(windows, batch_size=batch_size, n_process=n_process)
+            segmented = ((sent.text for sent in doc.sents) for doc in docs)
+
+        results: List[List[str]] = [[] for _ in texts]
+        for i, sentences in zip(owners, segmented):
+            results[i].extend(sent for sent in map(str.strip, sentences) if sent)
+        logger.debug("Extracted sentences from {} texts", len(texts))
+        return [tuple(sentences) for sentences in results], False
     except Exception as e:
-        logger.error(f"Error processing text with spaCy: {e}")
+        logger.error(f"Error detecting sentences: {e}")
         logger.warning("Falling back to simple sentence splitting")
         # Fallback to simple sentence splitting
-        return _simple_sentence_split(text)
+        return [tuple(_simple_sentence_split(text)) for text in texts], True
+
+
+def _text_windows(text: str, window_length: int) -> List[str]:
+    """Split a text into windows of at most window_length characters.
+
+    Windows end at the last paragraph break ("\n\n") inside the limit, or at
+    the last whitespace if the window holds no paragraph break.
+
+    Args:
+        text: The text to split
+        window_length: Maximum number of characters in a window
+
+    Returns:
+        List of windows that concatenate back to the text
+    """
+    windows = []
+    start = 0
+    while len(text) - start > window_length:
+        limit = start + window_length
+        end = text.rfind("\n\n", start + 1, limit)
+        if end == -1:
+            end = max(
+                text.rfind(" ", start + 1, limit), text.rfind("\n", start + 1, limit)
+            )
+        if end == -1:
+            end = limit
+        windows.append(text[start:end])
+        start = end
+    windows.append(text[start:])
+    return windows
 
 
 def _simple_sentence_split(text: str) -> List[str]:
@@ -63,7 +400,7 @@ def _simple_sentence_split(text: str) -> List[str]:
 
     # Split on common sentence-ending punctuation
     sentences = []
-    for sent in text.replace("!", ".").replace("?", ".").split("."):
+    for sent in text.translate(_SENTENCE_END_TABLE).split("."):
         sent = sent.strip()
         if sent:
             sentences.append(sent + ".")
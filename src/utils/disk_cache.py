@@ -0,0 +1,136 @@
+"""Module containing a small SQLite-backed key/value cache with expiry.
+
+Used to persist external API lookups (Crossref citation counts, exaly journal
+rankings) between runs, so that DOIs and journals seen before never hit the
+network again until their entry expires, and detected sentences, so that
+abstracts seen before are not segmented again.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Iterable, Optional, Tuple
+
+from loguru import logger
+
+
+class DiskCache:
+    """Persistent key/value cache stored in a SQLite file.
+
+    Values must be JSON serializable. Every entry carries its own expiry time,
+    which allows failed lookups (None / empty results) to be stored with a
+    shorter TTL than successful ones.
+
+    Attributes:
+        path: Path to the SQLite database file
+        ttl: Default time-to-live of an entry in seconds
+        negative_ttl: Time-to-live in seconds for empty results (None, {}, [])
+    """
+
+    def __init__(self, path: str, ttl: float, negative_ttl: Optional[float] = None):
+        """Initialize the cache, creating the database file if needed.
+
+        Args:
+            path: Path to the SQLite database file
+            ttl: Default time-to-live of an entry in seconds
+            negative_ttl: Time-to-live in seconds for empty results.
+                Defaults to ttl.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, expires REAL NOT NULL, value TEXT NOT NULL)"
+            )
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Look up a key in the cache.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            Tuple of (found, value). found is False for missing or expired keys.
+        """
+        try:
+            with self._lock:
+                row = self._connection.execute(
+                    "SELECT expires, value FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to read cache entry {key} from {self.path}: {e}")
+            return False, None
+
+        if row is None or row[0] < time.time():
+            return False, None
+
+        return True, json.loads(row[1])
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value in the cache.
+
+        Args:
+            key: The cache key
+            value: JSON serializable value to store
+            ttl: Time-to-live in seconds. Defaults to ttl, or negative_ttl
+                for empty values.
+        """
+        if ttl is None:
+            ttl = self.negative_ttl if _is_empty(value) else self.ttl
+
+        try:
+            with self._lock, self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                    (key, time.time() + ttl, json.dumps(value)),
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write cache entry {key} to {self.path}: {e}")
+
+    def set_many(
+        self, items: Iterable[Tuple[str, Any]], ttl: Optional[float] = None
+    ) -> None:
+        """Store several values in the cache with a single transaction.
+
+        Args:
+            items: (key, value) pairs with JSON serializable values
+            ttl: Time-to-live in seconds. Defaults to ttl, or negative_ttl
+                for empty values.
+        """
+        now = time.time()
+        try:
+            rows = []
+            for key, value in items:
+                entry_ttl = ttl
+                if entry_ttl is None:
+                    entry_ttl = self.negative_ttl if _is_empty(value) else self.ttl
+                rows.append((key, now + entry_ttl, json.dumps(value)))
+
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO cache (key, expires, value) VALUES (?, ?, ?)",
+                    rows,
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Failed to write cache entries to {self.path}: {e}")
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def _is_empty(value: Any) -> bool:
+    """Check whether a cached value represents a failed or empty lookup."""
+    return value is None or (isinstance(value, (dict, list)) and not value)
@@ -0,0 +1,22 @@
+"""This module contains the get_tokenizer function for the tiktoken encoding used
+to measure token lengths of article text.
+"""
+
+from functools import lru_cache
+
+import tiktoken  # type: ignore
+
+TOKENIZER_ENCODING = "p50k_base"
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer() -> tiktoken.Encoding:
+    """Get the shared tokenizer, loaded on first use and reused afterwards.
+
+    Loading an encoding takes tens of milliseconds, so every parser and worker
+    process shares this single instance instead of creating its own.
+
+    Returns:
+        The TOKENIZER_ENCODING tiktoken encoding
+    """
+    return tiktoken.get_encoding(TOKENIZER_ENCODING)
@@ -1,15 +1,27 @@
 import os
 import sys
 import pytest
+from unittest.mock import patch
 
 # Add the parent directory to the path so we can import the src modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from src.utils.article_splitter import (
+    BATCH_ENCODE_MIN_SENTENCES,
+    _TOKEN_LENGTH_CACHE,
     split_article_paragraphs,
+    split_articles_paragraphs,
     _split_sentences_into_chunks,
+    _token_lengths,
+)
+from src.utils.disk_cache import DiskCache
+from src.utils.detect_sentences import (
+    SPACY_BATCH_SIZE,
+    _SENTENCE_CACHE,
+    _disk_cache_key,
+    get_sentences,
+    get_sentences_batch,
 )
-from src.utils.detect_sentences import get_sentences
 
 
 class TestArticleSplitter:
@@ -121,3 +133,124 @@ class TestArticleSplitter:
             assert "total_splits" in split
             assert split["section_title"] == "Abstract"
             assert split["section_type"] == "ABSTRACT"
+
+    def test_token_lengths_batch_matches_single(self):
+        """Test that batch and per-sentence encoding give the same lengths."""
+        sentences = [
+            f"Sentence number {i} of a long abstract."
+            for i in range(BATCH_ENCODE_MIN_SENTENCES)
+        ]
+
+        _TOKEN_LENGTH_CACHE.clear()
+        batch_lengths = _token_lengths(sentences)
+        _TOKEN_LENGTH_CACHE.clear()
+        single_lengths = [_token_lengths([sentence])[0] for sentence in sentences]
+
+        assert batch_lengths == single_lengths
+
+    def test_token_lengths_cached(self):
+        """Test that repeated sentences are only encoded once."""
+        _TOKEN_LENGTH_CACHE.clear()
+        sentences = ["All rights reserved.", "A new finding.", "All rights reserved."]
+        expected = _token_lengths(sentences)
+
+        with patch("src.utils.article_splitter.get_tokenizer") as mock_tokenizer:
+            assert _token_lengths(sentences[::-1]) == expected[::-1]
+        mock_tokenizer.assert_not_called()
+
+    def test_split_articles_paragraphs_matches_single(self):
+        """Test that splitting a batch of articles equals splitting each one."""
+        text = " ".join(f"This is sentence number {i}." for i in range(40))
+        articles = [
+            {"abstract": [{"text": text, "section_title": "Abstract"}], "pmid": "1"},
+            {"abstract": [], "pmid": "2"},
+            {"abstract": [{"text": text[:200], "section_title": "Intro"}], "pmid": "3"},
+        ]
+
+        assert split_articles_paragraphs(articles, 50, 10, 1) == [
+            split_article_paragraphs(article, 50, 10, 1) for article in articles
+        ]
+
+    def test_short_section_kept_whole(self):
+        """Test that a section fitting in one split gives the sentence path text."""
+        text = (
+            "BACKGROUND\nWe studied mice.  They were fine.\n\n\n"
+            "METHODS\nMice were fed daily."
+        )
+        article = {"abstract": [{"text": text, "section_title": "Abstract"}]}
+        sentences = get_sentences(text)
+        _TOKEN_LENGTH_CACHE.clear()
+
+        splits = split_article_paragraphs(article, 50, 5, 1)
+
+        assert [split["text"] for split in splits] == [" ".join(sentences)]
+        # The sentences are not encoded one by one
+        assert not any(sentence in _TOKEN_LENGTH_CACHE for sentence in sentences)
+
+    def test_get_sentences_batch_matches_single_calls(self):
+        """Test that batched sentence detection matches per-text calls."""
+        texts = ["First one. Second one.", "", "Only a single sentence here."]
+
+        assert get_sentences_batch(texts, batch_size=2) == [
+            get_sentences(text) for text in texts
+        ]
+
+    def test_get_sentences_cached(self):
+        """Test that repeated texts go through sentence detection once."""
+        _SENTENCE_CACHE.clear()
+        texts = ["One sentence. Another one.", "One sentence. Another one."]
+
+        with patch(
+            "src.utils.detect_sentences._detect_sentences",
+            return_value=([("One sentence.", "Another one.")], False),
+        ) as mock_detect:
+            first = get_sentences_batch(texts)
+            second = get_sentences(texts[0])
+
+        mock_detect.assert_called_once_with([texts[0]], SPACY_BATCH_SIZE, 1)
+        assert first == [["One sentence.", "Another one."]] * 2
+        assert second == first[0]
+
+    def test_get_sentences_disk_cache(self, tmp_path):
+        """Test that detected sentences are reused from the persistent cache."""
+        cache = DiskCache(str(tmp_path / "sentences.sqlite"), ttl=60)
+        text = "Stored in the cache. Read back later."
+        _SENTENCE_CACHE.clear()
+        expected = get_sentences_batch([text], cache=cache)
+
+        _SENTENCE_CACHE.clear()
+        with patch("src.utils.detect_sentences._detect_sentences") as mock_detect:
+            assert get_sentences_batch([text], cache=cache) == expected
+
+        mock_detect.assert_not_called()
+
+    def test_fallback_sentences_not_cached(self, tmp_path):
+        """Test that fallback splits after a pipeline error are not cached."""
+        cache = DiskCache(str(tmp_path / "sentences.sqlite"), ttl=60)
+        text = "Dr. Smith asked why? Nobody knew."
+        _SENTENCE_CACHE.clear()
+
+        with patch(
+            "src.utils.detect_sentences.get_nlp", side_effect=RuntimeError("down")
+        ), patch("src.utils.detect_sentences.USE_SPACY", True):
+            fallback = get_sentences_batch([text], cache=cache)
+        assert fallback == [["Dr.", "Smith asked why.", "Nobody knew."]]
+        assert text not in _SENTENCE_CACHE
+        assert cache.get(_disk_cache_key(text)) == (False, None)
+
+        with patch("src.utils.detect_sentences.USE_SPACY", True):
+            recovered = get_sentences_batch([text], cache=cache)
+        assert recovered != fallback
+        assert text in _SENTENCE_CACHE
+        assert cache.get(_disk_cache_key(text)) == (True, recovered[0])
+
+    def test_long_text_segmented_in_windows(self):
+        """Test that windowed segmentation keeps the sentences of a long text."""
+        paragraph = "First sentence here. Second sentence follows."
+        text = "\n\n".join([paragraph] * 20)
+        _SENTENCE_CACHE.clear()
+        expected = get_sentences(text)
+
+        _SENTENCE_CACHE.clear()
+        with patch("src.utils.detect_sentences.SENTENCE_WINDOW_LENGTH", 100):
+            assert get_sentences(text) == expected
@@ -0,0 +1,145 @@
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+import orjson
+import requests
+from urllib3 import HTTPResponse
+
+# Add the parent directory to the path so we can import the src modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.api.citation_count import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CROSSREF_API_URL,
+    _CircuitBreaker,
+    _RATE_LIMITER,
+    _SESSION,
+    get_article_citation_count,
+    get_article_citation_counts,
+)
+
+
+def _crossref_response(count):
+    """Build a mock Crossref response with the given citation count."""
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {}
+    response.content = orjson.dumps({"message": {"is-referenced-by-count": count}})
+    return response
+
+
+class TestCitationCount:
+    """Test cases for the citation_count module."""
+
+    def test_empty_doi(self):
+        """Test that an empty DOI returns None without a request."""
+        with patch("src.api.citation_count._SESSION.get") as mock_get:
+            assert get_article_citation_count(None, "12345") is None
+            mock_get.assert_not_called()
+
+    @patch("src.api.citation_count._SESSION.get")
+    def test_get_article_citation_count(self, mock_get):
+        """Test getting the citation count of a single article."""
+        mock_get.return_value = _crossref_response(42)
+
+        assert get_article_citation_count("10.1000/test", "12345") == 42
+        mock_get.assert_called_once()
+
+    @patch("src.api.citation_count._SESSION.get")
+    def test_get_article_citation_counts_keeps_order(self, mock_get):
+        """Test that batched lookups return counts in input order."""
+        counts = {"10.1000/a": 1, "10.1000/b": 2, "10.1000/c": 3}
+        mock_get.side_effect = lambda url, **kwargs: _crossref_response(
+            counts[url[len(CROSSREF_API_URL) :]]
+        )
+
+        pairs = [
+            ("10.1000/c", "3"),
+            ("10.1000/a", "1"),
+            (None, "0"),
+            ("10.1000/b", "2"),
+        ]
+        assert get_article_citation_counts(pairs) == [3, 1, None, 2]
+
+    @patch("src.api.citation_count._SESSION.get")
+    def test_throttled_lookup_not_cached(self, mock_get):
+        """Test that a 429 response pauses requests and is not cached."""
+        throttled = MagicMock()
+        throttled.status_code = 429
+        throttled.headers = {"Retry-After": "0"}
+        mock_get.return_value = throttled
+        cache = MagicMock()
+        cache.get.return_value = (False, None)
+
+        with patch.object(_RATE_LIMITER, "pause") as mock_pause:
+            assert get_article_citation_count("10.1000/test", "1", cache) is None
+
+        mock_pause.assert_called_once_with(0.0)
+        cache.set.assert_not_called()
+
+    @patch("src.api.citation_count._SESSION.get")
+    def test_unknown_doi_cached(self, mock_get):
+        """Test that a 404 response is cached as a miss."""
+        not_found = MagicMock()
+        not_found.status_code = 404
+        not_found.headers = {}
+        mock_get.return_value = not_found
+        cache = MagicMock()
+        cache.get.return_value = (False, None)
+
+        assert get_article_citation_count("10.1000/missing", "1", cache) is None
+        cache.set.assert_called_once_with("10.1000/missing", None)
+
+    @patch("src.api.citation_count._SESSION.get")
+    def test_circuit_opens_after_failures(self, mock_get):
+        """Test that repeated connection errors stop further requests."""
+        mock_get.side_effect = requests.exceptions.ConnectionError("down")
+        cache = MagicMock()
+        cache.get.return_value = (False, None)
+
+        with patch("src.api.citation_count._CIRCUIT_BREAKER", _CircuitBreaker()):
+            for i in range(CIRCUIT_FAILURE_THRESHOLD + 3):
+                assert get_article_citation_count(f"10.1000/{i}", str(i), cache) is None
+
+        assert mock_get.call_count == CIRCUIT_FAILURE_THRESHOLD
+        cache.set.assert_not_called()
+
+    def test_circuit_half_open_single_probe(self):
+        """Test that only one probe is let through once the circuit times out."""
+        breaker = _CircuitBreaker(failure_threshold=2, reset_timeout=60)
+
+        with patch("src.api.citation_count.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            breaker.record_failure()
+            assert not breaker.allow()
+
+        with patch("src.api.citation_count.time.monotonic", return_value=161.0):
+            assert breaker.allow()
+            assert not breaker.allow()
+
+            breaker.record_failure()
+            assert not breaker.allow()
+
+        with patch("src.api.citation_count.time.monotonic", return_value=222.0):
+            assert breaker.allow()
+            assert not breaker.allow()
+
+            breaker.record_success()
+            assert breaker.allow()
+            assert breaker.allow()
+
+    def test_session_ignores_retry_after(self):
+        """Test that a huge Retry-After does not make the session sleep."""
+        retry = _SESSION.get_adapter(CROSSREF_API_URL).max_retries
+        throttled = HTTPResponse(status=429, headers={"Retry-After": "3600"})
+        unavailable = HTTPResponse(status=503, headers={"Retry-After": "3600"})
+
+        # A 429 is handed to the rate limiter instead of being retried
+        assert not retry.is_retry("GET", throttled.status, has_retry_after=True)
+
+        retry = retry.increment("GET", "/", response=unavailable)
+        with patch("urllib3.util.retry.time.sleep") as mock_sleep:
+            retry.sleep(unavailable)
+
+        assert all(call.args[0] < 60 for call in mock_sleep.call_args_list)
@@ -0,0 +1,41 @@
+import os
+import sys
+
+# Add the parent directory to the path so we can import the src modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.utils.disk_cache import DiskCache
+
+
+class TestDiskCache:
+    """Test cases for the disk_cache module."""
+
+    def test_set_and_get(self, tmp_path):
+        """Test that stored values persist across cache instances."""
+        path = str(tmp_path / "cache.sqlite")
+        cache = DiskCache(path, ttl=60)
+        cache.set("10.1000/a", 42)
+        cache.set("Nature", {"Impact Factor": 49.9})
+        cache.close()
+
+        cache = DiskCache(path, ttl=60)
+        assert cache.get("10.1000/a") == (True, 42)
+        assert cache.get("Nature") == (True, {"Impact Factor": 49.9})
+        assert cache.get("missing") == (False, None)
+
+    def test_negative_ttl(self, tmp_path):
+        """Test that empty results expire with the negative TTL."""
+        cache = DiskCache(str(tmp_path / "cache.sqlite"), ttl=60, negative_ttl=-1)
+        cache.set("none", None)
+        cache.set("zero", 0)
+
+        assert cache.get("none") == (False, None)
+        assert cache.get("zero") == (True, 0)
+
+    def test_set_many(self, tmp_path):
+        """Test that several values are stored with one call."""
+        cache = DiskCache(str(tmp_path / "cache.sqlite"), ttl=60, negative_ttl=-1)
+        cache.set_many([("a", ["One."]), ("b", [])])
+
+        assert cache.get("a") == (True, ["One."])
+        assert cache.get("b") == (False, None)
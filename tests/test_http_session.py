@@ -0,0 +1,28 @@
+import os
+import sys
+from unittest.mock import patch
+
+from urllib3 import HTTPResponse
+
+# Add the parent directory to the path so we can import the src modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.api.http_session import create_session
+
+
+class TestHttpSession:
+    """Test cases for the http_session module."""
+
+    def test_retry_after_is_bounded(self):
+        """Test that a huge Retry-After sleeps at most max_retry_after seconds."""
+        session = create_session(max_retry_after=5)
+        retry = session.get_adapter("https://example.org").max_retries
+        response = HTTPResponse(status=429, headers={"Retry-After": "3600"})
+
+        # Each attempt gets a new Retry, which must keep the bound
+        retry = retry.increment("GET", "/", response=response)
+
+        with patch("urllib3.util.retry.time.sleep") as mock_sleep:
+            retry.sleep(response)
+
+        mock_sleep.assert_called_once_with(5)
@@ -0,0 +1,141 @@
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+# Add the parent directory to the path so we can import the src modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.api.journal_ranking import (
+    _get_cached_journal_ranking,
+    _normalize_journal_name,
+    get_journal_ranking,
+    get_journal_rankings,
+)
+
+EXALY_HTML = b"""
+<html><body>
+<table>
+  <tr><th>Journal</th><th>star</th><th>Impact Factor</th>
+      <th>Citations</th><th>Articles</th></tr>
+  <tr><td><a href="/journal/1"> Nature Reviews </a></td><td></td>
+      <td>60.2</td><td>1.1M</td><td>2.5K</td></tr>
+  <tr><td><a href="/journal/2"> Nature </a></td><td></td>
+      <td>49.9</td><td>4.2M</td><td>8.9K</td></tr>
+</table>
+</body></html>
+"""
+
+
+def _exaly_response(content):
+    """Build a mock exaly response with the given HTML content."""
+    response = MagicMock()
+    response.status_code = 200
+    response.headers = {}
+    response.iter_content.return_value = [
+        content[i : i + 64] for i in range(0, len(content), 64)
+    ]
+    return response
+
+
+class TestJournalRanking:
+    """Test cases for the journal_ranking module."""
+
+    def setup_method(self):
+        """Clear the in-memory ranking cache between tests."""
+        _get_cached_journal_ranking.cache_clear()
+
+    def test_normalize_journal_name(self):
+        """Test that ampersand and spacing variants normalize to the same name."""
+        assert _normalize_journal_name("Brain&Behavior ") == "brain and behavior"
+        assert _normalize_journal_name("Brain  &  Behavior") == "brain and behavior"
+
+    def test_empty_journal_name(self):
+        """Test that an empty journal name returns an empty dictionary."""
+        assert get_journal_ranking("") == {}
+
+    @patch("src.api.journal_ranking._SESSION.get")
+    def test_get_journal_ranking_exact_match(self, mock_get):
+        """Test that the exactly matching table row is used."""
+        mock_get.return_value = _exaly_response(EXALY_HTML)
+
+        assert get_journal_ranking("Nature", "12345") == {
+            "Journal": "Nature",
+            "Impact Factor": 49.9,
+            "Citations": 4200000,
+            "Articles": 8900,
+        }
+
+    @patch("src.api.journal_ranking._SESSION.get")
+    def test_get_journal_ranking_drains_response(self, mock_get):
+        """Test that the rest of the body is read before the response is closed."""
+        content = EXALY_HTML + b"<table><tr><td>Other</td></tr></table>" * 50
+        chunks = iter([content[i : i + 64] for i in range(0, len(content), 64)])
+        response = _exaly_response(content)
+        response.iter_content.side_effect = lambda chunk_size: chunks
+        mock_get.return_value = response
+
+        assert get_journal_ranking("Nature", "12345")["Journal"] == "Nature"
+        assert next(chunks, None) is None
+        response.close.assert_called_once()
+
+    @patch("src.api.journal_ranking._SESSION.get")
+    def test_get_journal_ranking_no_table(self, mock_get):
+        """Test that a page without a ranking table returns an empty dictionary."""
+        mock_get.return_value = _exaly_response(b"<html><body></body></html>")
+
+        assert get_journal_ranking("Nature", "12345") == {}
+
+    @patch("src.api.journal_ranking._SESSION.get")
+    def test_get_journal_ranking_first_table_only(self, mock_get):
+        """Test that rows of later tables are ignored."""
+        first_table = (
+            b"<table><tr><th>Journal</th><th>Rank</th></tr>"
+            b"<tr><td>Other</td><td>1</td></tr></table>"
+        )
+        html = EXALY_HTML.replace(b"<table>", first_table + b"<table>", 1)
+        mock_get.return_value = _exaly_response(html)
+
+        assert get_journal_ranking("Nature", "12345") == {
+            "Journal": "Other",
+            "Rank": "1",
+        }
+
+    @patch("src.api.journal_ranking._SESSION.get")
+    def test_get_journal_ranking_memoized(self, mock_get):
+        """Test that spelling variants of a journal are only requested once."""
+        mock_get.return_value = _exaly_response(EXALY_HTML)
+
+        first = get_journal_ranking("Nature", "1")
+        first["Journal"] = "modified"
+        second = get_journal_ranking(" NATURE ", "2")
+
+        mock_get.assert_called_once()
+        assert second["Journal"] == "Nature"
+
+    @patch("src.api.journal_ranking._SESSION.get")
+    def test_get_journal_rankings_keeps_order(self, mock_get):
+        """Test that batched lookups keep input order and dedupe journals."""
+        mock_get.return_value = _exaly_response(EXALY_HTML)
+
+        rankings = get_journal_rankings(["Nature", None, " nature "])
+
+        mock_get.assert_called_once()
+        assert [ranking.get("Journal") for ranking in rankings] == [
+            "Nature",
+            None,
+            "Nature",
+        ]
+        assert rankings[0] is not rankings[2]
+
+    @patch("src.api.journal_ranking._SESSION.get")
+    def test_get_journal_ranking_name_with_suffix_letters(self, mock_get):
+        """Test that K or M letters in non-numeric values are left alone."""
+        html = EXALY_HTML.replace(b" Nature </a>", b" Kidney International </a>")
+        mock_get.return_value = _exaly_response(html)
+
+        assert get_journal_ranking("Kidney International", "12345") == {
+            "Journal": "Kidney International",
+            "Impact Factor": 49.9,
+            "Citations": 4200000,
+            "Articles": 8900,
+        }
@@ -1,11 +1,16 @@
+import gzip
+import json
 import os
 import sys
 import pytest
 from unittest.mock import patch, MagicMock
 
+from lxml import etree
+
 # Add the parent directory to the path so we can import the src modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.extractors.xml_extractors import AuthorExtractor
 from src.parsers.pubmed_parser import PubmedParser
 
 
@@ -21,20 +26,21 @@ class TestPubmedParser:
         assert parser.citation_count_bool is False
         assert parser.journal_ranking_bool is False
 
-    @patch("src.api.pubmed_api.requests.get")
+    @patch("src.api.pubmed_api._SESSION.get")
     def test_get_pubmed_article_xml(self, mock_get):
         """Test getting PubMed article XML."""
         # Setup mock response
         mock_response = MagicMock()
-        mock_response.text = "<PubmedArticleSet><PubmedArticle>Test XML</PubmedArticle></PubmedArticleSet>"
+        mock_response.content = b"<PubmedArticleSet><PubmedArticle>Test XML</PubmedArticle></PubmedArticleSet>"
         mock_response.raise_for_status.return_value = None
         mock_get.return_value = mock_response
 
         parser = PubmedParser()
         xml = parser.get_pubmed_article_xml("12345")
 
-        assert xml == mock_response.text
+        assert xml == mock_response.content
         mock_get.assert_called_once()
+        assert mock_get.call_args.kwargs["params"]["id"] == "12345"
 
     def test_get_pubmed_article_xml_empty_pmid(self):
         """Test getting PubMed article XML with empty PMID."""
@@ -42,3 +48,172 @@ class TestPubmedParser:
         with pytest.raises(ValueError):
             parser.get_pubmed_article_xml("")
 
+    def test_dump(self, tmp_path):
+        """Test writing an article dictionary to a JSON file."""
+        article = {"pmid": "12345", "meta_info": {"title": "Café study"}}
+        path = tmp_path / "pubmed_12345.json"
+
+        PubmedParser.dump(article, str(path))
+
+        assert json.loads(path.read_text(encoding="utf-8")) == article
+
+    def test_build_pubmed_json_filters(self):
+        """Test that articles outside the allowed languages or types are skipped."""
+        xml_tree = etree.fromstring(
+            "<PubmedArticle><MedlineCitation><PMID>12345</PMID><Article>"
+            "<Language>ger</Language><PublicationTypeList>"
+            '<PublicationType UI="D016428">Journal Article</PublicationType>'
+            "</PublicationTypeList></Article></MedlineCitation></PubmedArticle>"
+        )
+
+        english_only = PubmedParser(allowed_languages=["eng"])
+        assert english_only.build_pubmed_json(xml_tree=xml_tree) is None
+        reviews_only = PubmedParser(allowed_publication_types=["Review"])
+        assert reviews_only.build_pubmed_json(xml_tree=xml_tree) is None
+
+        article = PubmedParser(
+            allowed_languages=["ger"], allowed_publication_types=["D016428"]
+        ).build_pubmed_json(xml_tree=xml_tree)
+        assert article["meta_info"]["languages"] == "ger"
+
+    def test_build_pubmed_json_component_error(self):
+        """Test that a failing extractor falls back to its default value."""
+        xml_tree = etree.fromstring(
+            "<PubmedArticle><MedlineCitation><PMID>1</PMID><Article>"
+            "<ArticleTitle>Title</ArticleTitle></Article></MedlineCitation>"
+            "</PubmedArticle>"
+        )
+        # The extractor table is built with the parser, so patch before it
+        with patch.object(
+            AuthorExtractor, "get_authors", side_effect=ValueError("bad")
+        ):
+            article = PubmedParser().build_pubmed_json(xml_tree=xml_tree)
+
+        assert article["meta_info"]["authors"] == []
+        assert article["meta_info"]["title"] == "Title"
+
+    def test_parse_pubmed_xml_to_jsonl(self, tmp_path):
+        """Test streaming the articles of a gzipped XML file to JSONL."""
+        articles = "".join(
+            "<PubmedArticle><MedlineCitation><PMID>{0}</PMID><Article>"
+            "<ArticleTitle>Title {0}</ArticleTitle></Article></MedlineCitation>"
+            "<PubmedData><ArticleIdList>"
+            '<ArticleId IdType="pubmed">{0}</ArticleId>'
+            "</ArticleIdList></PubmedData></PubmedArticle>".format(pmid)
+            for pmid in ("1", "2")
+        )
+        xml_path = tmp_path / "articles.xml.gz"
+        with gzip.open(xml_path, "wt", encoding="utf-8") as f:
+            f.write(f"<PubmedArticleSet>{articles}</PubmedArticleSet>")
+        jsonl_path = tmp_path / "articles.jsonl"
+
+        written = []
+
+        counts = PubmedParser().parse_pubmed_xml_to_jsonl(
+            str(xml_path), str(jsonl_path), on_article=written.append
+        )
+
+        lines = jsonl_path.read_bytes().splitlines(keepends=True)
+        assert counts == (2, 0)
+        assert written == [("1", 0), ("2", len(lines[0]))]
+        assert json.loads(lines[1])["meta_info"]["title"] == "Title 2"
+
+    def test_parse_pubmed_xml_iter_truncated_file(self, tmp_path):
+        """Test that the articles before a parse error are still yielded."""
+        articles = "".join(
+            "<PubmedArticle><MedlineCitation><PMID>{0}</PMID><Article>"
+            "<ArticleTitle>Title {0}</ArticleTitle></Article></MedlineCitation>"
+            "</PubmedArticle>".format(pmid)
+            for pmid in range(1, 11)
+        )
+        xml_path = tmp_path / "truncated.xml.gz"
+        with gzip.open(xml_path, "wt", encoding="utf-8") as f:
+            f.write(f"<PubmedArticleSet>{articles}<PubmedArticle><MedlineCit")
+
+        parser = PubmedParser()
+        serial = list(parser.parse_pubmed_xml_iter(str(xml_path)))
+        parallel = list(
+            parser.parse_pubmed_xml_iter_parallel(
+                str(xml_path), max_workers=2, chunk_size=3
+            )
+        )
+
+        for results in (serial, parallel):
+            assert results[-1] is None
+            titles = [r["meta_info"]["title"] for r in results[:-1]]
+            assert titles == [f"Title {i}" for i in range(1, 11)]
+
+    def test_parse_pubmed_xml_iter_batches_lookups(self, tmp_path):
+        """Test that citation and ranking lookups are made once per batch."""
+        articles = "".join(
+            "<PubmedArticle><MedlineCitation><PMID>{0}</PMID><Article>"
+            "<Journal><Title>Nature</Title></Journal></Article></MedlineCitation>"
+            "<PubmedData><ArticleIdList>"
+            '<ArticleId IdType="pubmed">{0}</ArticleId>'
+            '<ArticleId IdType="doi">10.1000/{0}</ArticleId>'
+            "</ArticleIdList></PubmedData></PubmedArticle>".format(pmid)
+            for pmid in ("1", "2")
+        )
+        xml_path = tmp_path / "articles.xml"
+        xml_path.write_text(f"<PubmedArticleSet>{articles}</PubmedArticleSet>")
+        parser = PubmedParser(
+            get_citation_count_bool=True, get_journal_ranking_bool=True
+        )
+
+        with patch(
+            "src.parsers.pubmed_parser.get_article_citation_counts",
+            return_value=[5, 7],
+        ) as mock_counts, patch(
+            "src.parsers.pubmed_parser.get_journal_rankings",
+            return_value=[{"Journal": "Nature"}],
+        ) as mock_rankings:
+            results = list(parser.parse_pubmed_xml_iter(str(xml_path)))
+
+        mock_counts.assert_called_once()
+        assert mock_counts.call_args.args[0] == [("10.1000/1", "1"), ("10.1000/2", "2")]
+        mock_rankings.assert_called_once()
+        assert mock_rankings.call_args.args[0] == ["Nature"]
+        assert [r["meta_info"]["citation_count"] for r in results] == [5, 7]
+        assert results[1]["meta_info"]["journal_ranking"] == {"Journal": "Nature"}
+
+    @patch("src.api.pubmed_api._SESSION.post")
+    def test_build_pubmed_json_batch_keeps_order(self, mock_post):
+        """Test that batched lookups return articles in PMID order."""
+        articles = "".join(
+            "<PubmedArticle><MedlineCitation><PMID>{0}</PMID><Article>"
+            "<ArticleTitle>Title {0}</ArticleTitle></Article></MedlineCitation>"
+            "<PubmedData><ArticleIdList>"
+            '<ArticleId IdType="pubmed">{0}</ArticleId>'
+            "</ArticleIdList></PubmedData></PubmedArticle>".format(pmid)
+            for pmid in ("1", "3")
+        )
+        mock_response = MagicMock()
+        mock_response.content = (
+            f"<PubmedArticleSet>{articles}</PubmedArticleSet>".encode()
+        )
+        mock_post.return_value = mock_response
+
+        articles = PubmedParser().build_pubmed_json_batch(["3", "1", "2"])
+
+        assert [a and a["pmid"] for a in articles] == ["3", "1", None]
+        assert articles[0]["meta_info"]["title"] == "Title 3"
+        mock_post.assert_called_once()
+        assert mock_post.call_args.kwargs["data"] == {"id": "3,1,2"}
+
+    @patch("src.api.pubmed_api._SESSION.post")
+    def test_build_pubmed_json_from_int_pmid(self, mock_post):
+        """Test that an integer PMID is fetched and mapped back to its article."""
+        mock_response = MagicMock()
+        mock_response.content = (
+            b"<PubmedArticleSet><PubmedArticle><MedlineCitation>"
+            b"<PMID>12345</PMID><Article><ArticleTitle>Title</ArticleTitle>"
+            b"</Article></MedlineCitation><PubmedData><ArticleIdList>"
+            b'<ArticleId IdType="pubmed">12345</ArticleId>'
+            b"</ArticleIdList></PubmedData></PubmedArticle></PubmedArticleSet>"
+        )
+        mock_post.return_value = mock_response
+
+        article = PubmedParser().build_pubmed_json_from_pmid(12345)
+
+        assert article["pmid"] == "12345"
+        assert mock_post.call_args.kwargs["data"] == {"id": "12345"}
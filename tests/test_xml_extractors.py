@@ -0,0 +1,65 @@
+import os
+import sys
+
+from lxml import etree
+
+# Add the parent directory to the path so we can import the src modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.extractors.xml_extractors import (
+    AbstractExtractor,
+    AuthorExtractor,
+    BaseExtractor,
+)
+
+
+class TestXmlExtractors:
+    """Test cases for the xml_extractors module."""
+
+    def test_stringify_children_nested(self):
+        """Test that text of nested children is included."""
+        node = etree.fromstring(
+            "<AbstractText>CO<sub>2</sub> and <i>E. coli<sup>R</sup></i> "
+            "levels<!-- note --></AbstractText>"
+        )
+
+        assert BaseExtractor().stringify_children(node) == "CO2 and E. coliR levels"
+
+    def test_stringify_children_none(self):
+        """Test that a missing node gives an empty string."""
+        assert BaseExtractor().stringify_children(None) == ""
+
+    def test_get_authors_missing_fields(self):
+        """Test that missing author fields give empty strings."""
+        xml_tree = etree.fromstring(
+            "<PubmedArticle><MedlineCitation><Article><AuthorList>"
+            "<Author><LastName>Doe</LastName><ForeName>Jane</ForeName>"
+            "<AffiliationInfo><Affiliation>Lab <i>A</i></Affiliation>"
+            "</AffiliationInfo></Author>"
+            "<Author><CollectiveName>Group</CollectiveName></Author>"
+            "</AuthorList></Article></MedlineCitation></PubmedArticle>"
+        )
+
+        authors = AuthorExtractor().get_authors(xml_tree)
+
+        assert [(a["first"], a["last"], a["affiliation"]) for a in authors] == [
+            ("Jane", "Doe", "Lab A"),
+            ("", "", ""),
+        ]
+
+    def test_extractors_resolve_pubmed_article(self):
+        """Test that the extractors accept a PubmedArticleSet root or tree."""
+        set_root = etree.fromstring(
+            "<PubmedArticleSet><PubmedArticle><MedlineCitation><Article>"
+            "<Abstract><AbstractText>Some abstract.</AbstractText></Abstract>"
+            "<AuthorList><Author><LastName>Doe</LastName></Author>"
+            "<Author><LastName>Roe</LastName></Author></AuthorList>"
+            "</Article></MedlineCitation></PubmedArticle></PubmedArticleSet>"
+        )
+
+        for xml_tree in (set_root, etree.ElementTree(set_root)):
+            abstract = AbstractExtractor().get_abstract(xml_tree)
+            authors = AuthorExtractor().get_authors(xml_tree)
+
+            assert abstract is not None
+            assert [a["last"] for a in authors] == ["Doe", "Roe"]